@@ -6,18 +6,55 @@ Serves real-time predictions and historical data
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+
+try:
+    from flask_caching import Cache
+    FLASK_CACHING_AVAILABLE = True
+except ImportError:
+    FLASK_CACHING_AVAILABLE = False
+    print("Warning: flask-caching not available, response caching disabled")
+
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        """Flask JSON provider backed by orjson (serializes NumPy natively)"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("Warning: orjson not available, using stdlib json responses")
 import pandas as pd
 import numpy as np
+from collections import namedtuple
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 import yaml
+import io
+import json
 import logging
+import os
 import sys
+import fcntl
 import joblib
 import threading
 import time
 
 
+# Immutable per-cycle view of the loaded data. The updater swaps a fresh
+# instance in with one (atomic) attribute assignment, so request handlers
+# never observe a frame mid-mutation.
+Snapshot = namedtuple('Snapshot', ['df', 'ts_ns', 'traffic'])
+
+
 class TrafficMonitoringAPI:
     """API server for traffic monitoring dashboard"""
     
@@ -28,7 +65,18 @@ class TrafficMonitoringAPI:
         
         # Initialize Flask app
         self.app = Flask(__name__)
+        if ORJSON_AVAILABLE:
+            self.app.json = OrjsonProvider(self.app)
         CORS(self.app, origins=self.config['api']['cors_origins'])
+
+        # Response cache for read-only endpoints (TTL = update interval)
+        if FLASK_CACHING_AVAILABLE:
+            self.cache = Cache(self.app, config={
+                'CACHE_TYPE': 'SimpleCache',
+                'CACHE_DEFAULT_TIMEOUT': self.config['api']['update_interval']
+            })
+        else:
+            self.cache = None
         
         # Load models
         self.models_dir = Path(self.config['storage']['models_dir'])
@@ -38,6 +86,35 @@ class TrafficMonitoringAPI:
         self.forecasting_model = None
         self.latest_predictions = None
         self.latest_data = None
+
+        # Hot-path handles hoisted out of the model dicts by load_models
+        self._feature_cols = None
+        self._forecast_model = None
+        self._forecast_predict = None
+        self._cluster_scaler = None
+        self._gmm = None
+        self._cluster_labels = None
+
+        # Aggregates precomputed once per update cycle, served as-is
+        self._hourly_pattern = None
+        self._weekly_pattern = None
+
+        # Current data snapshot read by the request handlers
+        self._snap = None
+
+        # Shared prediction snapshot (single writer, many readers)
+        self._snapshot_path = self.processed_data_dir / 'latest_predictions.json'
+        self._updater_lock_fp = None
+        self._is_updater = False
+        self._shared_predictions = None
+        self._shared_predictions_time = 0.0
+
+        # Incremental CSV reload state (offset/mtime/identity of last read)
+        self._csv_offset = 0
+        self._csv_mtime = None
+        self._csv_ino = None
+        self._csv_first_line = None
+        self._csv_tail_bytes = b''
         
         # Setup routes
         self.setup_routes()
@@ -74,7 +151,9 @@ class TrafficMonitoringAPI:
             # Load clustering model
             clustering_path = self.models_dir / 'gmm_clustering_model.pkl'
             if clustering_path.exists():
-                self.clustering_model = joblib.load(clustering_path)
+                # mmap keeps the artifact's arrays in shared pages
+                # across WSGI workers instead of N private copies
+                self.clustering_model = joblib.load(clustering_path, mmap_mode='r')
                 self.logger.info("Clustering model loaded")
             else:
                 self.logger.warning("Clustering model not found")
@@ -82,57 +161,319 @@ class TrafficMonitoringAPI:
             # Load forecasting model
             forecasting_path = self.models_dir / 'xgboost_forecaster.pkl'
             if forecasting_path.exists():
-                self.forecasting_model = joblib.load(forecasting_path)
+                self.forecasting_model = joblib.load(forecasting_path, mmap_mode='r')
                 self.logger.info("Forecasting model loaded")
             else:
                 self.logger.warning("Forecasting model not found")
-        
+
+            # Hoist the pieces the prediction hot path needs so it skips
+            # the per-call dict indexing
+            if self.forecasting_model is not None:
+                self._feature_cols = list(self.forecasting_model['feature_cols'])
+                model = self.forecasting_model['model']
+                # Raw boosters take ndarrays via inplace_predict; the
+                # old sklearn-wrapper bundles use predict()
+                if hasattr(model, 'inplace_predict'):
+                    # Cap at best_iteration like the trainer's
+                    # _predict_xgboost, so served predictions match the
+                    # evaluated model rather than including the extra
+                    # rounds kept by early stopping
+                    best = getattr(model, 'best_iteration', None)
+                    if best is not None:
+                        self._forecast_predict = partial(
+                            model.inplace_predict, iteration_range=(0, best + 1)
+                        )
+                    else:
+                        self._forecast_predict = model.inplace_predict
+                else:
+                    self._forecast_predict = model.predict
+                self._forecast_model = model
+
+            if self.clustering_model is not None:
+                self._cluster_scaler = self.clustering_model['scaler']
+                self._gmm = self.clustering_model['gmm']
+                self._cluster_labels = self.clustering_model['cluster_labels']
+
         except Exception as e:
             self.logger.error(f"Error loading models: {e}")
     
+    def _downcast_dtypes(self, df):
+        """
+        Downcast numeric columns to shrink memory footprint
+
+        Args:
+            df: DataFrame with default (int64/float64) dtypes
+
+        Returns:
+            DataFrame with compact dtypes
+        """
+        for col in df.select_dtypes(include='float64').columns:
+            df[col] = df[col].astype('float32')
+
+        for col in ('hour', 'day_of_week', 'month'):
+            if col in df.columns:
+                df[col] = df[col].astype('int8')
+
+        return df
+
+    def _load_csv_tail(self, csv_path):
+        """
+        Append only the rows written since the last load
+
+        Args:
+            csv_path: Path to the processed CSV file
+
+        Returns:
+            True if the incremental read succeeded
+        """
+        try:
+            with open(csv_path, 'rb') as f:
+                # The producer may rewrite the whole file instead of
+                # appending; if the first line changed the old offset
+                # points at unrelated bytes, so force a full reload
+                if f.readline() != self._csv_first_line:
+                    self.logger.info("CSV was rewritten, doing a full reload")
+                    return False
+
+                # An in-place rewrite (to_csv in 'w' mode) keeps the
+                # inode and header but may change earlier rows - e.g.
+                # the last partial window gets updated values. Verify
+                # the bytes just before the old offset are untouched
+                tail = self._csv_tail_bytes
+                if tail:
+                    f.seek(self._csv_offset - len(tail))
+                    if f.read(len(tail)) != tail:
+                        self.logger.info("CSV rows before the tail changed, doing a full reload")
+                        return False
+
+                f.seek(self._csv_offset)
+                new_bytes = f.read()
+                self._csv_offset = f.tell()
+                self._csv_tail_bytes = (tail + new_bytes)[-256:]
+
+            if not new_bytes.strip():
+                return True
+
+            new_df = pd.read_csv(
+                io.BytesIO(new_bytes),
+                header=None,
+                names=list(self.latest_data.columns)
+            )
+            new_df['timestamp'] = pd.to_datetime(
+                new_df['timestamp'], format='%Y-%m-%d %H:%M:%S', cache=True
+            )
+            new_df = self._downcast_dtypes(new_df)
+
+            self.latest_data = pd.concat(
+                [self.latest_data, new_df], ignore_index=True
+            ).sort_values('timestamp')
+
+            self.logger.info(f"Appended {len(new_df)} new records")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Incremental load failed, falling back to full read: {e}")
+            return False
+
+    def _remember_csv_state(self, csv_path, stat):
+        """Record the CSV identity used to validate later tail reads"""
+        self._csv_offset = stat.st_size
+        self._csv_mtime = stat.st_mtime
+        self._csv_ino = stat.st_ino
+        try:
+            with open(csv_path, 'rb') as f:
+                self._csv_first_line = f.readline()
+                # Trailing bytes anchor the next tail read: if they
+                # change, the file was rewritten rather than appended to
+                f.seek(max(0, stat.st_size - 256))
+                self._csv_tail_bytes = f.read(stat.st_size - f.tell())
+        except OSError:
+            self._csv_first_line = None
+            self._csv_tail_bytes = b''
+
     def load_latest_data(self):
-        """Load latest processed data"""
+        """Load latest processed data (Parquet cache preferred over CSV)"""
         try:
-            data_path = self.processed_data_dir / 'processed_traffic_data.csv'
-            if data_path.exists():
-                df = pd.read_csv(data_path)
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+            csv_path = self.processed_data_dir / 'processed_traffic_data.csv'
+            parquet_path = self.processed_data_dir / 'processed_traffic_data.parquet'
+
+            # Skip all work when the CSV has not changed since last cycle
+            if csv_path.exists() and self.latest_data is not None:
+                stat = csv_path.stat()
+
+                if stat.st_mtime == self._csv_mtime:
+                    return
+
+                # File grew in place: read just the appended tail. A new
+                # inode means the file was replaced, not appended to
+                if (
+                    stat.st_ino == self._csv_ino
+                    and stat.st_size > self._csv_offset
+                    and self._load_csv_tail(csv_path)
+                ):
+                    self._csv_mtime = stat.st_mtime
+                    return
+
+            # Prefer the Parquet cache: typed binary columns, no text parsing
+            if parquet_path.exists() and (
+                not csv_path.exists()
+                or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+            ):
+                self.latest_data = pd.read_parquet(parquet_path)
+                if csv_path.exists():
+                    self._remember_csv_state(csv_path, csv_path.stat())
+                self.logger.info(f"Loaded {len(self.latest_data)} records from Parquet cache")
+            elif csv_path.exists():
+                stat = csv_path.stat()
+                # memory_map lets the parser read straight from the page
+                # cache instead of buffered read() syscalls
+                df = pd.read_csv(csv_path, memory_map=True)
+                df['timestamp'] = pd.to_datetime(
+                    df['timestamp'], format='%Y-%m-%d %H:%M:%S', cache=True
+                )
+                df = self._downcast_dtypes(df)
                 self.latest_data = df.sort_values('timestamp')
+                self._remember_csv_state(csv_path, stat)
+
+                # Write Parquet sidecar so later cycles skip CSV parsing
+                # (updater only, so reader workers never race the write)
+                if self._is_updater:
+                    try:
+                        self.latest_data.to_parquet(parquet_path, compression='snappy')
+                    except (ImportError, ValueError) as e:
+                        self.logger.debug(f"Could not write Parquet cache: {e}")
+
                 self.logger.info(f"Loaded {len(df)} records")
             else:
                 self.logger.warning("Processed data not found")
         except Exception as e:
             self.logger.error(f"Error loading data: {e}")
     
+    def try_acquire_updater_lock(self):
+        """
+        Try to become the single background updater process
+
+        Under a multi-worker WSGI server only the worker holding this
+        lock generates and publishes predictions; the other workers
+        still refresh their own read-only data snapshot each cycle.
+
+        Returns:
+            True if this process holds the updater lock
+        """
+        if self._updater_lock_fp is not None:
+            return True
+
+        lock_path = Path(self.config['storage']['logs_dir']) / 'api_updater.lock'
+
+        try:
+            fp = open(lock_path, 'w')
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fp.write(str(os.getpid()))
+            fp.flush()
+            self._updater_lock_fp = fp
+            self.logger.info("Acquired background updater lock")
+            return True
+        except OSError:
+            self.logger.info("Another worker runs the updater - serving from shared snapshot")
+            return False
+
+    def _write_predictions_snapshot(self):
+        """Atomically publish latest predictions for other workers"""
+        try:
+            tmp_path = self._snapshot_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self.latest_predictions, f)
+            os.replace(tmp_path, self._snapshot_path)
+        except Exception as e:
+            self.logger.error(f"Error writing predictions snapshot: {e}")
+
+    def get_latest_predictions(self):
+        """
+        Get current predictions, from memory or the shared snapshot
+
+        Returns:
+            Predictions dict or None
+        """
+        if self.latest_predictions is not None:
+            return self.latest_predictions
+
+        # Reader worker: pick up the writer's snapshot, coalescing bursty
+        # clients through a short in-process cache
+        now = time.monotonic()
+        if self._shared_predictions is not None and now - self._shared_predictions_time < 1.0:
+            return self._shared_predictions
+
+        try:
+            with open(self._snapshot_path, 'r') as f:
+                self._shared_predictions = json.load(f)
+            self._shared_predictions_time = now
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Error reading predictions snapshot: {e}")
+            return None
+
+        return self._shared_predictions
+
+    def build_snapshot(self):
+        """Publish an immutable snapshot of the loaded data for the handlers"""
+        if self.latest_data is None:
+            return
+
+        df = self.latest_data
+        self._snap = Snapshot(
+            df=df,
+            ts_ns=df['timestamp'].to_numpy(dtype='datetime64[ns]').view('int64'),
+            traffic=df['avg_devices'].to_numpy(dtype='float32')
+        )
+
+    def compute_patterns(self):
+        """Precompute hourly/weekly traffic aggregates for the pattern endpoints"""
+        if self.latest_data is None:
+            return
+
+        try:
+            if 'hour' in self.latest_data.columns:
+                hourly = self.latest_data.groupby('hour')['avg_devices'].agg(['mean', 'std']).reset_index()
+                self._hourly_pattern = hourly.to_dict(orient='records')
+
+            if 'day_of_week' in self.latest_data.columns:
+                day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+                weekly = self.latest_data.groupby('day_of_week')['avg_devices'].agg(['mean', 'std']).reset_index()
+                weekly.insert(0, 'day', weekly['day_of_week'].astype(int).map(dict(enumerate(day_names))))
+                self._weekly_pattern = weekly.to_dict(orient='records')
+        except Exception as e:
+            self.logger.error(f"Error computing patterns: {e}")
+
     def generate_predictions(self):
         """Generate predictions for next 4 hours"""
         try:
-            if self.forecasting_model is None or self.latest_data is None:
+            if self._forecast_model is None or self.latest_data is None:
                 self.logger.warning("Models or data not available for predictions")
                 return None
-            
-            # Get latest features
-            latest_features = self.latest_data.iloc[-1:][self.forecasting_model['feature_cols']]
-            
+
+            # Get latest features as a single contiguous row
+            latest_features = self.latest_data.iloc[-1][
+                self._feature_cols
+            ].to_numpy(dtype='float32').reshape(1, -1)
+
             # Generate prediction
-            model = self.forecasting_model['model']
-            prediction = model.predict(latest_features.values)[0]
-            
+            prediction = self._forecast_predict(latest_features)[0]
+
             # Get current cluster if clustering model available
             current_cluster = None
             cluster_label = None
             cluster_proba = None
-            
-            if self.clustering_model is not None:
-                clustering = self.clustering_model
-                X = self.latest_data.iloc[-1:][['avg_devices']].values
-                current_cluster = int(clustering['gmm'].predict(
-                    clustering['scaler'].transform(X)
-                )[0])
-                cluster_label = clustering['cluster_labels'][current_cluster]
-                cluster_proba = clustering['gmm'].predict_proba(
-                    clustering['scaler'].transform(X)
-                )[0].tolist()
+
+            if self._gmm is not None:
+                X = self.latest_data['avg_devices'].to_numpy()[-1:].reshape(1, -1)
+
+                # Scale once and reuse; predict() is just the argmax of the posteriors
+                X_scaled = self._cluster_scaler.transform(X)
+                proba = self._gmm.predict_proba(X_scaled)[0]
+
+                current_cluster = int(proba.argmax())
+                cluster_label = self._cluster_labels[current_cluster]
+                cluster_proba = proba.tolist()
             
             # Create prediction object
             current_time = datetime.now()
@@ -151,6 +492,9 @@ class TrafficMonitoringAPI:
                 }
             }
             
+            # Publish for reader workers
+            self._write_predictions_snapshot()
+
             self.logger.info(f"Generated prediction: {prediction:.2f} devices")
             return self.latest_predictions
         
@@ -159,13 +503,24 @@ class TrafficMonitoringAPI:
             return None
     
     def _update_loop(self):
-        """Background thread for updating predictions"""
+        """Background thread refreshing data (and predictions on the updater)"""
         update_interval = self.config['api']['update_interval']
-        
+
         while self.running:
             try:
                 self.load_latest_data()
-                self.generate_predictions()
+                self.build_snapshot()
+                self.compute_patterns()
+                # Only the lock holder generates predictions and
+                # publishes the shared snapshot; readers pick it up in
+                # get_latest_predictions()
+                if self._is_updater:
+                    self.generate_predictions()
+
+                # Drop cached responses so fresh data is visible immediately
+                if self.cache is not None:
+                    self.cache.clear()
+
                 time.sleep(update_interval)
             except Exception as e:
                 self.logger.error(f"Error in update loop: {e}")
@@ -173,7 +528,13 @@ class TrafficMonitoringAPI:
     
     def setup_routes(self):
         """Setup Flask routes"""
-        
+        # Memoize read-only endpoints; no-op decorator when caching unavailable
+        if self.cache is not None:
+            cached = self.cache.cached(query_string=True)
+        else:
+            def cached(f):
+                return f
+
         @self.app.route('/api/health', methods=['GET'])
         def health():
             """Health check endpoint"""
@@ -189,105 +550,100 @@ class TrafficMonitoringAPI:
         @self.app.route('/api/current', methods=['GET'])
         def get_current():
             """Get current traffic conditions"""
-            if self.latest_predictions is None:
+            predictions = self.get_latest_predictions()
+            if predictions is None:
                 return jsonify({'error': 'No predictions available'}), 503
-            
-            return jsonify(self.latest_predictions)
+
+            return jsonify(predictions)
         
         @self.app.route('/api/history', methods=['GET'])
+        @cached
         def get_history():
             """Get historical traffic data"""
-            if self.latest_data is None:
+            # Bind the snapshot once; the updater may swap in a new one
+            # mid-request without affecting us
+            snap = self._snap
+            if snap is None:
                 return jsonify({'error': 'No data available'}), 503
-            
+
             # Get query parameters
             hours = request.args.get('hours', 48, type=int)
-            
-            # Filter last N hours
+
+            # Binary-search the cutoff in the sorted timestamp array:
+            # O(log n) with no boolean mask allocation
             cutoff_time = datetime.now() - timedelta(hours=hours)
-            recent_data = self.latest_data[
-                self.latest_data['timestamp'] >= cutoff_time
-            ].copy()
-            
-            # Convert to JSON-friendly format
-            history = []
-            for _, row in recent_data.iterrows():
-                history.append({
-                    'timestamp': row['timestamp'].isoformat(),
-                    'traffic': float(row['avg_devices']),
-                    'hour': int(row['hour']) if 'hour' in row else None,
-                    'day_of_week': int(row['day_of_week']) if 'day_of_week' in row else None
-                })
+            cutoff_ns = np.datetime64(cutoff_time, 'ns').astype('int64')
+            start = int(np.searchsorted(snap.ts_ns, cutoff_ns))
+            # Read-only slice; the snapshot frame is never mutated, so no
+            # defensive copy is needed
+            recent_data = snap.df.iloc[start:]
             
+            # Convert to JSON-friendly format (vectorized, no per-row loop)
+            payload = {
+                'timestamp': recent_data['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S'),
+                'traffic': recent_data['avg_devices'].astype('float64'),
+                'hour': recent_data['hour'] if 'hour' in recent_data.columns else None,
+                'day_of_week': (
+                    recent_data['day_of_week']
+                    if 'day_of_week' in recent_data.columns else None
+                )
+            }
+            history = pd.DataFrame(payload).to_dict(orient='records')
+
             return jsonify({
                 'data': history,
                 'count': len(history)
             })
         
         @self.app.route('/api/statistics', methods=['GET'])
+        @cached
         def get_statistics():
             """Get traffic statistics"""
-            if self.latest_data is None:
+            snap = self._snap
+            if snap is None:
                 return jsonify({'error': 'No data available'}), 503
-            
-            # Calculate statistics
+
+            # Calculate statistics from the snapshot arrays
+            traffic = snap.traffic
+            today = traffic[-24:]
+
             stats = {
                 'current': {
-                    'traffic': float(self.latest_data.iloc[-1]['avg_devices']),
-                    'timestamp': self.latest_data.iloc[-1]['timestamp'].isoformat()
+                    'traffic': float(traffic[-1]),
+                    'timestamp': snap.df['timestamp'].iloc[-1].isoformat()
                 },
                 'today': {
-                    'mean': float(self.latest_data.tail(24)['avg_devices'].mean()),
-                    'max': float(self.latest_data.tail(24)['avg_devices'].max()),
-                    'min': float(self.latest_data.tail(24)['avg_devices'].min())
+                    'mean': float(today.mean()),
+                    'max': float(today.max()),
+                    'min': float(today.min())
                 },
                 'all_time': {
-                    'mean': float(self.latest_data['avg_devices'].mean()),
-                    'max': float(self.latest_data['avg_devices'].max()),
-                    'min': float(self.latest_data['avg_devices'].min()),
-                    'std': float(self.latest_data['avg_devices'].std())
+                    'mean': float(traffic.mean()),
+                    'max': float(traffic.max()),
+                    'min': float(traffic.min()),
+                    'std': float(traffic.std(ddof=1))
                 }
             }
-            
+
             return jsonify(stats)
         
         @self.app.route('/api/hourly_pattern', methods=['GET'])
+        @cached
         def get_hourly_pattern():
             """Get average traffic by hour of day"""
-            if self.latest_data is None or 'hour' not in self.latest_data.columns:
+            if self._hourly_pattern is None:
                 return jsonify({'error': 'No data available'}), 503
-            
-            hourly = self.latest_data.groupby('hour')['avg_devices'].agg(['mean', 'std']).reset_index()
-            
-            pattern = []
-            for _, row in hourly.iterrows():
-                pattern.append({
-                    'hour': int(row['hour']),
-                    'mean': float(row['mean']),
-                    'std': float(row['std'])
-                })
-            
-            return jsonify({'data': pattern})
+
+            return jsonify({'data': self._hourly_pattern})
         
         @self.app.route('/api/weekly_pattern', methods=['GET'])
+        @cached
         def get_weekly_pattern():
             """Get average traffic by day of week"""
-            if self.latest_data is None or 'day_of_week' not in self.latest_data.columns:
+            if self._weekly_pattern is None:
                 return jsonify({'error': 'No data available'}), 503
-            
-            day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            weekly = self.latest_data.groupby('day_of_week')['avg_devices'].agg(['mean', 'std']).reset_index()
-            
-            pattern = []
-            for _, row in weekly.iterrows():
-                pattern.append({
-                    'day': day_names[int(row['day_of_week'])],
-                    'day_of_week': int(row['day_of_week']),
-                    'mean': float(row['mean']),
-                    'std': float(row['std'])
-                })
-            
-            return jsonify({'data': pattern})
+
+            return jsonify({'data': self._weekly_pattern})
         
         @self.app.route('/api/predict', methods=['POST'])
         def predict():
@@ -303,8 +659,10 @@ class TrafficMonitoringAPI:
         """Start the API server"""
         # Load models
         self.load_models()
-        
-        # Start update thread
+
+        # Every worker refreshes its own data snapshot; the lock decides
+        # which one also generates and publishes predictions
+        self._is_updater = self.try_acquire_updater_lock()
         self.update_thread.start()
         
         # Run Flask app
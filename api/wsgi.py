@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+WSGI Entry Point for the Traffic Monitoring API
+Run under a production server instead of the Flask dev server:
+
+    gunicorn -k gthread -w 2 --threads 8 -b 0.0.0.0:5000 api.wsgi:app
+
+The gthread worker suits this app: the pandas/NumPy handlers release the
+GIL in C code, so threads give real request concurrency.
+"""
+
+import sys
+from pathlib import Path
+
+# Run from the repository root so relative config/data paths resolve
+sys.path.append(str(Path(__file__).parent.parent))
+
+from api.server import TrafficMonitoringAPI
+
+_api = TrafficMonitoringAPI()
+_api.load_models()
+
+# Every worker refreshes its own data snapshot; the lock decides which
+# one also generates predictions and publishes the shared snapshot.
+_api._is_updater = _api.try_acquire_updater_lock()
+_api.update_thread.start()
+
+app = _api.app
@@ -7,10 +7,13 @@ Scans for nearby Bluetooth devices and logs anonymized data
 import bluetooth
 import time
 import hashlib
+import itertools
 import json
 import logging
+import numpy as np
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import yaml
@@ -33,6 +36,13 @@ except ImportError:
     BLUEPY_AVAILABLE = False
     print("Warning: bluepy not available, using pybluez only")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("Warning: orjson not available, using stdlib json")
+
 
 class BluetoothScanner:
     """Main class for Bluetooth device scanning and logging"""
@@ -44,7 +54,17 @@ class BluetoothScanner:
         self.running = False
         self.scan_count = 0
         self.device_history = {}  # Track device first/last seen times
+
+        # Persistent daily JSONL handle (avoids open/close per scan)
+        self._jsonl_fp = None
+        self._jsonl_date = None
         self.salt = self._generate_salt()
+        self._salt_bytes = bytes.fromhex(self.salt)
+        self._hash_algorithm = self.config['privacy'].get('hash_algorithm', 'blake2b')
+        self._mac_hash_cache = {}  # Memoized hashes for recurring devices
+
+        if self.config['privacy']['store_raw_mac']:
+            self.logger.warning("Raw MAC storage is enabled - privacy risk!")
         
         # Initialize USB storage manager if available
         if USB_MANAGER_AVAILABLE:
@@ -111,13 +131,31 @@ class BluetoothScanner:
         Returns:
             Hashed MAC address string
         """
-        if self.config['privacy']['store_raw_mac']:
-            self.logger.warning("Raw MAC storage is enabled - privacy risk!")
-        
-        # Combine MAC with salt and hash
-        combined = f"{mac_address}{self.salt}"
-        hash_obj = hashlib.sha256(combined.encode())
-        return hash_obj.hexdigest()
+        # Repeat pedestrians recur across hundreds of scans within a
+        # session, so a hit avoids the hash entirely
+        cached = self._mac_hash_cache.get(mac_address)
+        if cached is not None:
+            return cached
+
+        if self._hash_algorithm == 'sha256':
+            # Legacy salted SHA-256 path
+            combined = f"{mac_address}{self.salt}"
+            mac_hash = hashlib.sha256(combined.encode()).hexdigest()
+        else:
+            # Keyed BLAKE2b: same one-way anonymization at a fraction of
+            # the cost, and the key replaces the string concatenation
+            mac_hash = hashlib.blake2b(
+                mac_address.encode(),
+                key=self._salt_bytes,
+                digest_size=16
+            ).hexdigest()
+
+        # Bound the cache; a full reset is cheap and rare
+        if len(self._mac_hash_cache) >= 8192:
+            self._mac_hash_cache.clear()
+        self._mac_hash_cache[mac_address] = mac_hash
+
+        return mac_hash
     
     def scan_bluetooth_classic(self):
         """
@@ -193,25 +231,27 @@ class BluetoothScanner:
             Combined list of all detected devices
         """
         self.logger.info("Starting scan...")
-        
-        # Scan both protocols
-        classic_devices = self.scan_bluetooth_classic()
-        ble_devices = self.scan_bluetooth_le()
-        
-        # Combine and deduplicate
-        all_devices = classic_devices + ble_devices
+
+        # Scan both protocols concurrently: the radios block independently
+        # in C extensions that release the GIL, so wall time is one scan
+        # duration instead of two
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            classic_future = executor.submit(self.scan_bluetooth_classic)
+            ble_future = executor.submit(self.scan_bluetooth_le)
+            classic_devices = classic_future.result()
+            ble_devices = ble_future.result()
+        
+        # Deduplicate in a single pass, keeping the stronger signal
         unique_devices = {}
-        
-        for device in all_devices:
-            mac_hash = device['mac_hash']
-            if mac_hash not in unique_devices:
-                unique_devices[mac_hash] = device
-            elif device['rssi'] is not None:
-                # Keep device with stronger signal
-                if unique_devices[mac_hash]['rssi'] is None or \
-                   device['rssi'] > unique_devices[mac_hash]['rssi']:
-                    unique_devices[mac_hash] = device
-        
+
+        for device in itertools.chain(classic_devices, ble_devices):
+            current = unique_devices.get(device['mac_hash'])
+            if current is None or (
+                device['rssi'] is not None
+                and (current['rssi'] is None or device['rssi'] > current['rssi'])
+            ):
+                unique_devices[device['mac_hash']] = device
+
         devices_list = list(unique_devices.values())
         self.logger.info(f"Scan complete: {len(devices_list)} unique devices detected")
         
@@ -230,46 +270,51 @@ class BluetoothScanner:
         """
         threshold = self.config['bluetooth']['stationary_threshold']
         transient_devices = []
-        
+
+        # Epoch seconds: plain float arithmetic in the hot path, no
+        # timedelta objects allocated per device
+        now = current_time.timestamp()
+
         for device in devices:
             mac_hash = device['mac_hash']
-            
+
             # Update device history
             if mac_hash not in self.device_history:
                 # First time seeing this device
                 self.device_history[mac_hash] = {
-                    'first_seen': current_time,
-                    'last_seen': current_time,
+                    'first_seen': now,
+                    'last_seen': now,
                     'is_stationary': False
                 }
                 transient_devices.append(device)
             else:
                 # Update last seen time
                 history = self.device_history[mac_hash]
-                history['last_seen'] = current_time
-                
+                history['last_seen'] = now
+
                 # Check if device has been present too long
-                duration = (current_time - history['first_seen']).total_seconds()
-                
-                if duration > threshold:
+                if now - history['first_seen'] > threshold:
                     if not history['is_stationary']:
                         self.logger.info(f"Device {mac_hash[:8]}... marked as stationary")
                         history['is_stationary'] = True
                 else:
                     # Still transient
                     transient_devices.append(device)
-        
+
         # Clean up old device history (not seen in last timeout period)
+        # in a single vectorized pass over the stacked last-seen times
         timeout = self.config['bluetooth']['device_timeout']
-        to_remove = []
-        
-        for mac_hash, history in self.device_history.items():
-            if (current_time - history['last_seen']).total_seconds() > timeout:
-                to_remove.append(mac_hash)
-        
-        for mac_hash in to_remove:
-            del self.device_history[mac_hash]
-        
+
+        if self.device_history:
+            macs = list(self.device_history)
+            last_seen = np.fromiter(
+                (self.device_history[mac]['last_seen'] for mac in macs),
+                dtype=np.float64,
+                count=len(macs)
+            )
+            for idx in np.nonzero(now - last_seen > timeout)[0]:
+                del self.device_history[macs[idx]]
+
         self.logger.debug(f"Filtered: {len(transient_devices)}/{len(devices)} transient devices")
         return transient_devices
     
@@ -288,10 +333,18 @@ class BluetoothScanner:
             self.logger.debug("Skipping empty scan (no devices detected)")
             return
         
-        # Create filename based on date
-        filename = f"scan_{timestamp.strftime('%Y%m%d')}.jsonl"
-        filepath = self.data_dir / filename
-        
+        # Rotate the persistent handle when the date changes
+        scan_date = timestamp.date()
+        if self._jsonl_fp is None or scan_date != self._jsonl_date:
+            self._close_data_file()
+            filename = f"scan_{timestamp.strftime('%Y%m%d')}.jsonl"
+            filepath = self.data_dir / filename
+            # Large buffer batches small JSONL lines into sequential writes
+            self._jsonl_fp = open(filepath, 'a', buffering=1024 * 1024)
+            self._jsonl_date = scan_date
+        else:
+            filepath = self._jsonl_fp.name
+
         # Prepare data record
         record = {
             'timestamp': timestamp.isoformat(),
@@ -299,11 +352,18 @@ class BluetoothScanner:
             'device_count': len(devices),
             'devices': devices
         }
-        
+
         # Append to JSONL file (one JSON object per line)
-        with open(filepath, 'a') as f:
-            f.write(json.dumps(record) + '\n')
-        
+        if ORJSON_AVAILABLE:
+            line = orjson.dumps(record).decode()
+        else:
+            line = json.dumps(record)
+        self._jsonl_fp.write(line + '\n')
+
+        # Flush periodically so a crash loses at most a few scans
+        if self.scan_count % 10 == 0:
+            self._jsonl_fp.flush()
+
         if len(devices) > 0:
             self.logger.debug(f"Data saved to {filepath} - {len(devices)} devices")
         else:
@@ -355,16 +415,28 @@ class BluetoothScanner:
                 self.logger.error(f"Error in scan loop: {e}", exc_info=True)
                 time.sleep(10)  # Wait before retrying
     
+    def _close_data_file(self):
+        """Flush and close the current JSONL file handle"""
+        if self._jsonl_fp is not None:
+            try:
+                self._jsonl_fp.close()
+            except Exception as e:
+                self.logger.error(f"Error closing data file: {e}")
+            self._jsonl_fp = None
+            self._jsonl_date = None
+
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
         self.logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
+        self._close_data_file()
         sys.exit(0)
-    
+
     def stop(self):
         """Stop the scanner"""
         self.logger.info("Stopping scanner...")
         self.running = False
+        self._close_data_file()
 
 
 def main():
@@ -5,6 +5,7 @@ Trains both GMM clustering and forecasting models
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 import yaml
@@ -14,20 +15,17 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from ml_models.gmm_clustering import TrafficPatternClustering
 from ml_models.traffic_forecasting import TrafficForecaster
+from utils.log_setup import setup_logging
 import json
 
+# Prediction plots render on this worker so PNG encoding at dpi=300
+# does not block the training pipeline; main() drains it on exit
+_viz_pool = ThreadPoolExecutor(max_workers=1)
 
-def setup_logging():
+
+def setup_trainer_logging():
     """Configure logging"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('logs/model_trainer.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    return logging.getLogger(__name__)
+    return setup_logging(__name__, 'logs/model_trainer.log')
 
 
 def train_clustering_model(data_path, logger):
@@ -110,16 +108,19 @@ def train_forecasting_model(data_path, logger, model_type='xgboost'):
     logger.info(f"Test set: {len(df_test)} samples")
     
     if model_type == 'xgboost':
-        # Prepare features
-        X_train, y_train, feature_cols = forecaster.prepare_features_xgboost(df_train)
-        X_test, y_test, _ = forecaster.prepare_features_xgboost(df_test)
-        
-        # Split training into train/val
-        from sklearn.model_selection import train_test_split
-        X_train, X_val, y_train, y_val = train_test_split(
-            X_train, y_train, test_size=0.2, random_state=42
-        )
-        
+        # Prepare features once, then slice the train/test splits
+        X_train, y_train, X_test, y_test, feature_cols = \
+            forecaster.prepare_features_xgboost_full(df, train_size)
+
+        # Split training into train/val by time order (a shuffled
+        # split leaks future rows into validation); slicing keeps
+        # zero-copy views
+        split = int(len(X_train) * 0.8)
+        X_val = X_train[split:]
+        y_val = y_train[split:]
+        X_train = X_train[:split]
+        y_train = y_train[:split]
+
         # Train
         forecaster.train_xgboost(X_train, y_train, X_val, y_val)
         
@@ -141,17 +142,18 @@ def train_forecasting_model(data_path, logger, model_type='xgboost'):
     # Evaluate
     metrics, y_pred = forecaster.evaluate(X_test, y_test)
     
-    # Visualize
+    # Visualize off the training thread
     viz_path = Path(f"data/models/{model_type}_predictions.png")
-    forecaster.visualize_predictions(y_test, y_pred, save_path=viz_path)
-    
+    _viz_pool.submit(forecaster.visualize_predictions, y_test, y_pred, save_path=viz_path)
+
     # Save model
     forecaster.save_model()
     
     # Save metrics
     metrics_path = Path(f"data/models/{model_type}_metrics.json")
     with open(metrics_path, 'w') as f:
-        json.dump(metrics, f, indent=2)
+        # No indent: keeps json on its C fast path
+        json.dump(metrics, f)
     
     logger.info("Forecasting model training complete")
     logger.info(f"RMSE: {metrics['rmse']:.3f}")
@@ -168,10 +170,12 @@ def main():
     print("=" * 60 + "\n")
     
     # Setup logging
-    logger = setup_logging()
+    logger = setup_trainer_logging()
     
-    # Check for processed data
-    data_path = Path("data/processed/processed_traffic_data.csv")
+    # Check for processed data (Parquet default, legacy CSV fallback)
+    data_path = Path("data/processed/processed_traffic_data.parquet")
+    if not data_path.exists():
+        data_path = data_path.with_suffix('.csv')
     if not data_path.exists():
         logger.error(f"Processed data not found at {data_path}")
         logger.error("Please run data_processor.py first")
@@ -193,30 +197,42 @@ def main():
               f"(mean={clustering_metrics['busy_mean']:.2f})")
         print("-" * 60 + "\n")
         
-        # Train XGBoost forecasting model
-        forecaster_xgb, xgb_metrics = train_forecasting_model(data_path, logger, 'xgboost')
-        
-        print("\n" + "-" * 60)
-        print("XGBOOST FORECASTING RESULTS:")
-        print(f"  RMSE: {xgb_metrics['rmse']:.3f}")
-        print(f"  MAE: {xgb_metrics['mae']:.3f}")
-        print(f"  R² Score: {xgb_metrics['r2']:.3f}")
-        print(f"  MAPE: {xgb_metrics['mape']:.2f}%")
-        print("-" * 60 + "\n")
-        
-        # Optionally train LSTM model
+        # Optionally train LSTM alongside XGBoost
         response = input("Train LSTM model as well? (y/n): ").strip().lower()
-        if response == 'y':
-            forecaster_lstm, lstm_metrics = train_forecasting_model(data_path, logger, 'lstm')
-            
+        train_lstm = response == 'y'
+
+        # Train the forecasters concurrently: XGBoost releases the GIL
+        # in its C++ core and the LSTM runs on TensorFlow's own
+        # threads, so the two phases overlap almost completely
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            xgb_future = pool.submit(train_forecasting_model, data_path, logger, 'xgboost')
+            lstm_future = (pool.submit(train_forecasting_model, data_path, logger, 'lstm')
+                           if train_lstm else None)
+
+            forecaster_xgb, xgb_metrics = xgb_future.result()
+
             print("\n" + "-" * 60)
-            print("LSTM FORECASTING RESULTS:")
-            print(f"  RMSE: {lstm_metrics['rmse']:.3f}")
-            print(f"  MAE: {lstm_metrics['mae']:.3f}")
-            print(f"  R² Score: {lstm_metrics['r2']:.3f}")
-            print(f"  MAPE: {lstm_metrics['mape']:.2f}%")
+            print("XGBOOST FORECASTING RESULTS:")
+            print(f"  RMSE: {xgb_metrics['rmse']:.3f}")
+            print(f"  MAE: {xgb_metrics['mae']:.3f}")
+            print(f"  R² Score: {xgb_metrics['r2']:.3f}")
+            print(f"  MAPE: {xgb_metrics['mape']:.2f}%")
             print("-" * 60 + "\n")
+
+            if lstm_future is not None:
+                forecaster_lstm, lstm_metrics = lstm_future.result()
+
+                print("\n" + "-" * 60)
+                print("LSTM FORECASTING RESULTS:")
+                print(f"  RMSE: {lstm_metrics['rmse']:.3f}")
+                print(f"  MAE: {lstm_metrics['mae']:.3f}")
+                print(f"  R² Score: {lstm_metrics['r2']:.3f}")
+                print(f"  MAPE: {lstm_metrics['mape']:.2f}%")
+                print("-" * 60 + "\n")
         
+        # Wait for any in-flight plot renders before reporting
+        _viz_pool.shutdown(wait=True)
+
         # Final summary
         print("\n" + "=" * 60)
         print("TRAINING PIPELINE COMPLETE")
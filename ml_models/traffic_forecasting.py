@@ -6,7 +6,6 @@ Predicts pedestrian traffic 4 hours ahead using XGBoost or LSTM
 
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split, TimeSeriesSplit
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import xgboost as xgb
 import tensorflow as tf
@@ -15,11 +14,109 @@ from tensorflow.keras import layers
 import joblib
 import yaml
 import logging
+import os
 import sys
+import threading
+import matplotlib
+matplotlib.use('Agg')  # non-interactive: render off the main thread
 import matplotlib.pyplot as plt
 from pathlib import Path
 import json
 
+# Add project root to path for shared utils
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.log_setup import setup_logging
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _build_windows(data_scaled, lookback, X_out):
+        """
+        Fill a preallocated (n, lookback, features) window buffer
+
+        Fallback sequence builder for NumPy versions without
+        sliding_window_view; each window copy runs on its own thread.
+        """
+        for i in prange(X_out.shape[0]):
+            X_out[i] = data_scaled[i:i + lookback]
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _metrics_kernel(y_true, y_pred):
+        """
+        Fused single-pass regression metrics
+
+        Accumulates mse/mae/r2/mape in one sweep instead of five
+        separate full-array reductions. Samples with |y_true| below
+        eps are excluded from MAPE rather than dividing by zero.
+        """
+        n = y_true.shape[0]
+        eps = 1e-9
+        se = 0.0
+        ae = 0.0
+        y_sum = 0.0
+        ape_sum = 0.0
+        ape_n = 0
+        for i in range(n):
+            d = y_true[i] - y_pred[i]
+            se += d * d
+            ae += abs(d)
+            y_sum += y_true[i]
+            if abs(y_true[i]) > eps:
+                ape_sum += abs(d / y_true[i])
+                ape_n += 1
+
+        mean = y_sum / n
+        ss_tot = 0.0
+        for i in range(n):
+            dm = y_true[i] - mean
+            ss_tot += dm * dm
+
+        mse = se / n
+        mae = ae / n
+        r2 = 1.0 - se / ss_tot if ss_tot > 0.0 else 0.0
+        mape = ape_sum / ape_n * 100.0 if ape_n > 0 else 0.0
+        return mse, mae, r2, mape
+
+
+# Shifted-target frames shared across forecaster instances in one
+# process (the trainer builds one forecaster per model type)
+_TARGET_CACHE = {}
+
+# pyplot keeps global state, so figure rendering must be serialized
+# when forecasters train in parallel threads
+_PLT_LOCK = threading.Lock()
+
+
+def _cuda_available():
+    """Check for a usable NVIDIA GPU without importing CUDA libraries"""
+    return Path('/proc/driver/nvidia/version').exists()
+
+
+def _physical_cores():
+    """
+    Physical core count for worker pinning
+
+    XGBoost histogram building slows down past the physical core count
+    when hyperthreads get oversubscribed, so cap n_jobs at the real
+    cores rather than os.cpu_count().
+    """
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return max(1, (os.cpu_count() or 2) // 2)
+
 
 class TrafficForecaster:
     """Time series forecasting for pedestrian traffic"""
@@ -53,32 +150,61 @@ class TrafficForecaster:
     def setup_logging(self):
         """Configure logging"""
         log_dir = Path(self.config['storage']['logs_dir'])
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        logging.basicConfig(
-            level=getattr(logging, self.config['logging']['level']),
-            format=self.config['logging']['format'],
-            handlers=[
-                logging.FileHandler(log_dir / 'traffic_forecasting.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
+        self.logger = setup_logging(
+            __name__,
+            log_dir / 'traffic_forecasting.log',
+            level=self.config['logging']['level'],
+            fmt=self.config['logging']['format']
         )
-        self.logger = logging.getLogger(__name__)
     
     def load_data(self, filepath):
         """
         Load processed traffic data
         
         Args:
-            filepath: Path to processed CSV file
-            
+            filepath: Path to processed data file (.parquet or .csv)
+
         Returns:
             DataFrame with traffic data
         """
         self.logger.info(f"Loading data from {filepath}")
-        df = pd.read_csv(filepath)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values('timestamp')
+        filepath = Path(filepath)
+
+        if filepath.suffix == '.parquet':
+            df = pd.read_parquet(filepath)
+        else:
+            # Parquet sidecar skips CSV parsing on every run after the
+            # first (the trainer loads the same file once per model)
+            cache = filepath.with_suffix('.parquet')
+            if cache.exists() and cache.stat().st_mtime >= filepath.stat().st_mtime:
+                self.logger.info(f"Using Parquet cache {cache.name}")
+                try:
+                    return pd.read_parquet(cache)
+                except Exception as e:
+                    # Unreadable cache (e.g. left by an interrupted
+                    # run): re-parse the CSV rather than crash
+                    self.logger.warning(f"Parquet cache unreadable, re-parsing CSV: {e}")
+
+            try:
+                # Multi-threaded columnar parse with native timestamp
+                # decoding — no second pass over the column
+                df = pd.read_csv(filepath, engine='pyarrow', parse_dates=['timestamp'])
+            except ImportError:
+                df = pd.read_csv(filepath)
+                df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', cache=True)
+            df = df.sort_values('timestamp')
+            try:
+                # Write to a per-writer temp file and rename into place:
+                # the trainer loads the same CSV from two threads, and a
+                # reader must never see a half-written cache
+                tmp = cache.with_name(
+                    f'.{cache.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+                )
+                df.to_parquet(tmp, engine='pyarrow', compression='snappy')
+                os.replace(tmp, cache)
+            except (ImportError, ValueError) as e:
+                self.logger.warning(f"Could not write Parquet cache: {e}")
+
         self.logger.info(f"Loaded {len(df)} records")
         return df
     
@@ -96,14 +222,24 @@ class TrafficForecaster:
         """
         if horizon is None:
             horizon = self.config['models']['forecasting']['forecast_horizon']
-        
-        df = df.copy()
-        df[f'{target_col}_future'] = df[target_col].shift(-horizon)
-        
-        # Drop rows without target
-        df = df.dropna(subset=[f'{target_col}_future'])
-        
+
+        # The trainer runs this once per model type on the same frame;
+        # memoize on a cheap fingerprint so the second call reuses the
+        # shifted frame
+        key = (target_col, horizon, len(df),
+               str(df['timestamp'].iloc[0]), str(df['timestamp'].iloc[-1]))
+        cached = _TARGET_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        # Attach the shifted target without copying the frame; the
+        # rows lacking a target are exactly the last `horizon`, so a
+        # tail slice replaces the dropna NaN scan
+        df[f'{target_col}_future'] = df[target_col].shift(-horizon).to_numpy()
+        df = df.iloc[:-horizon]
+
         self.logger.info(f"Created target for {horizon}-hour forecast")
+        _TARGET_CACHE[key] = df
         return df
     
     def prepare_features_xgboost(self, df):
@@ -120,12 +256,33 @@ class TrafficForecaster:
         exclude_cols = ['timestamp', 'avg_devices_future']
         self.feature_cols = [col for col in df.columns if col not in exclude_cols]
         
-        X = df[self.feature_cols].values
-        y = df['avg_devices_future'].values
-        
+        # Column-major float32: hist scans per feature, so Fortran
+        # order gives it contiguous columns and halves the bandwidth
+        # of the float64 default
+        X = np.asfortranarray(df[self.feature_cols].to_numpy(dtype=np.float32, copy=False))
+        y = df['avg_devices_future'].to_numpy(dtype=np.float32, copy=False)
+
         self.logger.info(f"Prepared {len(self.feature_cols)} features for XGBoost")
         return X, y, self.feature_cols
-    
+
+    def prepare_features_xgboost_full(self, df, train_size):
+        """
+        Prepare features once and slice into train/test sets
+
+        Materializing the feature matrix for the full frame and slicing
+        halves the pandas-to-numpy copy work of preparing train and
+        test frames separately.
+
+        Args:
+            df: DataFrame with traffic data (time-sorted)
+            train_size: Number of leading rows for the training split
+
+        Returns:
+            X_train, y_train, X_test, y_test, feature names
+        """
+        X, y, feature_cols = self.prepare_features_xgboost(df)
+        return X[:train_size], y[:train_size], X[train_size:], y[train_size:], feature_cols
+
     def prepare_sequences_lstm(self, df, lookback=None):
         """
         Prepare sequences for LSTM model
@@ -144,22 +301,46 @@ class TrafficForecaster:
         feature_cols = ['avg_devices', 'hour', 'day_of_week', 'is_weekend']
         available_cols = [col for col in feature_cols if col in df.columns]
         
-        data = df[available_cols].values
-        target = df['avg_devices_future'].values
-        
-        # Normalize data
-        from sklearn.preprocessing import MinMaxScaler
-        self.scaler = MinMaxScaler()
-        data_scaled = self.scaler.fit_transform(data)
-        
-        # Create sequences
-        X, y = [], []
-        for i in range(lookback, len(data_scaled)):
-            X.append(data_scaled[i-lookback:i])
-            y.append(target[i])
-        
-        X = np.array(X)
-        y = np.array(y)
+        # float32 halves sequence memory and matches what the LSTM
+        # trains in anyway
+        data = df[available_cols].to_numpy(dtype=np.float32)
+        target = df['avg_devices_future'].to_numpy(dtype=np.float32)
+
+        # Min-max normalize with a fused in-place subtract/divide;
+        # MinMaxScaler would make two extra float64 passes and an
+        # allocation for these four columns. Constant columns get a
+        # range of 1.0 so they scale to zero instead of dividing by it.
+        mn = data.min(axis=0)
+        mx = data.max(axis=0)
+        rng = np.where(mx > mn, mx - mn, np.float32(1.0)).astype(np.float32)
+        data_scaled = np.empty_like(data)
+        np.subtract(data, mn, out=data_scaled)
+        np.divide(data_scaled, rng, out=data_scaled)
+        self.scaler = {'min': mn, 'range': rng}
+        
+        # Create sequences as one strided view over the scaled array
+        # instead of materializing each window in a Python loop; only
+        # the final contiguous copy allocates
+        if len(data_scaled) <= lookback:
+            self.logger.warning("Not enough rows for a single sequence")
+            return np.empty((0, lookback, data_scaled.shape[1])), np.empty(0)
+
+        if hasattr(np.lib.stride_tricks, 'sliding_window_view'):
+            windows = np.lib.stride_tricks.sliding_window_view(
+                data_scaled, (lookback, data_scaled.shape[1])
+            ).squeeze(axis=1)
+            X = np.ascontiguousarray(windows[:-1])
+        elif NUMBA_AVAILABLE:
+            # Older NumPy: parallel JIT copy into a preallocated buffer
+            X = np.empty(
+                (len(data_scaled) - lookback, lookback, data_scaled.shape[1]),
+                dtype=np.float32
+            )
+            _build_windows(data_scaled, lookback, X)
+        else:
+            X = np.stack([data_scaled[i - lookback:i]
+                          for i in range(lookback, len(data_scaled))])
+        y = target[lookback:]
         
         self.logger.info(f"Prepared {len(X)} sequences with lookback={lookback}")
         return X, y
@@ -179,28 +360,49 @@ class TrafficForecaster:
         
         # Get parameters from config
         params = self.config['models']['xgboost']
-        
-        self.model = xgb.XGBRegressor(
-            n_estimators=params['n_estimators'],
-            max_depth=params['max_depth'],
-            learning_rate=params['learning_rate'],
-            subsample=params['subsample'],
-            colsample_bytree=params['colsample_bytree'],
-            random_state=params['random_state'],
-            objective='reg:squarederror',
+
+        # Histogram tree construction on GPU when one is present
+        # (order-of-magnitude faster split finding); plain CPU hist
+        # otherwise
+        device = 'cuda' if _cuda_available() else 'cpu'
+        if device == 'cuda':
+            self.logger.info("CUDA device detected, training on GPU")
+
+        # QuantileDMatrix bins the features once up front; the
+        # validation matrix shares the training bin cuts via ref=
+        dtrain = xgb.QuantileDMatrix(X_train, y_train, max_bin=256)
+        dval = xgb.QuantileDMatrix(X_val, y_val, ref=dtrain)
+
+        self.model = xgb.train(
+            {
+                'max_depth': params['max_depth'],
+                'learning_rate': params['learning_rate'],
+                'subsample': params['subsample'],
+                'colsample_bytree': params['colsample_bytree'],
+                'seed': params['random_state'],
+                'objective': 'reg:squarederror',
+                'eval_metric': 'rmse',
+                'tree_method': 'hist',
+                'max_bin': 256,
+                'nthread': _physical_cores(),
+                'device': device
+            },
+            dtrain,
+            num_boost_round=params['n_estimators'],
+            evals=[(dval, 'val')],
             early_stopping_rounds=20,
-            eval_metric='rmse'
-        )
-        
-        # Train with validation
-        self.model.fit(
-            X_train, y_train,
-            eval_set=[(X_val, y_val)],
-            verbose=True
+            verbose_eval=False
         )
-        
+
         self.logger.info("XGBoost training complete")
         return self.model
+
+    def _predict_xgboost(self, X):
+        """Predict with the booster directly, honoring early stopping"""
+        best = getattr(self.model, 'best_iteration', None)
+        if best is not None:
+            return self.model.inplace_predict(X, iteration_range=(0, best + 1))
+        return self.model.inplace_predict(X)
     
     def build_lstm_model(self, input_shape):
         """
@@ -213,14 +415,36 @@ class TrafficForecaster:
             Compiled Keras model
         """
         params = self.config['models']['lstm']
-        
+
+        # Mixed precision runs the matmuls in FP16 on GPUs that
+        # support it; the final activation keeps the output FP32 for
+        # numerical stability
+        if _cuda_available():
+            tf.keras.mixed_precision.set_global_policy('mixed_float16')
+            # XLA fuses the Dense head into fewer kernels
+            tf.config.optimizer.set_jit(True)
+
+        # Keep every LSTM argument on the defaults cuDNN requires
+        # (tanh/sigmoid activations, no recurrent dropout, unrolling
+        # off) so the layer dispatches to the fused cuDNN kernel
+        # instead of the generic per-step implementation
+        lstm_args = {
+            'activation': 'tanh',
+            'recurrent_activation': 'sigmoid',
+            'recurrent_dropout': 0,
+            'unroll': False,
+            'use_bias': True
+        }
+
         model = keras.Sequential([
-            layers.LSTM(params['units'], return_sequences=True, input_shape=input_shape),
+            layers.LSTM(params['units'], return_sequences=True,
+                        input_shape=input_shape, **lstm_args),
             layers.Dropout(params['dropout']),
-            layers.LSTM(params['units'] // 2),
+            layers.LSTM(params['units'] // 2, **lstm_args),
             layers.Dropout(params['dropout']),
             layers.Dense(32, activation='relu'),
-            layers.Dense(1)
+            layers.Dense(1),
+            layers.Activation('linear', dtype='float32')
         ])
         
         model.compile(
@@ -256,12 +480,27 @@ class TrafficForecaster:
             restore_best_weights=True
         )
         
+        # Feed through tf.data so batching, caching and host-to-device
+        # copies pipeline asynchronously with training instead of
+        # blocking on Python-side array indexing
+        batch_size = params['batch_size']
+        # cache() before shuffle(): caching after would freeze the
+        # first epoch's batch order and silently disable reshuffling
+        train_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                    .cache()
+                    .shuffle(min(len(X_train), 8192))
+                    .batch(batch_size)
+                    .prefetch(tf.data.AUTOTUNE))
+        val_ds = (tf.data.Dataset.from_tensor_slices((X_val, y_val))
+                  .batch(batch_size)
+                  .cache()
+                  .prefetch(tf.data.AUTOTUNE))
+
         # Train
         history = self.model.fit(
-            X_train, y_train,
+            train_ds,
             epochs=params['epochs'],
-            batch_size=params['batch_size'],
-            validation_data=(X_val, y_val),
+            validation_data=val_ds,
             callbacks=[early_stop],
             verbose=1
         )
@@ -283,18 +522,27 @@ class TrafficForecaster:
         
         # Get predictions
         if self.model_type == 'xgboost':
-            y_pred = self.model.predict(X_test)
+            y_pred = self._predict_xgboost(X_test)
         else:  # lstm
             y_pred = self.model.predict(X_test).flatten()
         
-        # Calculate metrics
-        mse = mean_squared_error(y_test, y_pred)
-        rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
-        
-        # Calculate percentage errors
-        mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
+        # Calculate metrics in one fused pass when numba is available
+        if NUMBA_AVAILABLE:
+            mse, mae, r2, mape = _metrics_kernel(
+                np.ascontiguousarray(y_test, dtype=np.float64),
+                np.ascontiguousarray(y_pred, dtype=np.float64)
+            )
+            rmse = np.sqrt(mse)
+        else:
+            mse = mean_squared_error(y_test, y_pred)
+            rmse = np.sqrt(mse)
+            mae = mean_absolute_error(y_test, y_pred)
+            r2 = r2_score(y_test, y_pred)
+
+            # Percentage errors, skipping zero targets
+            nonzero = np.abs(y_test) > 1e-9
+            mape = (np.mean(np.abs((y_test[nonzero] - y_pred[nonzero]) / y_test[nonzero])) * 100
+                    if nonzero.any() else 0.0)
         
         metrics = {
             'mse': float(mse),
@@ -323,62 +571,64 @@ class TrafficForecaster:
             timestamps: Optional timestamps for x-axis
             save_path: Path to save figure
         """
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        
-        # 1. Predictions vs Actual
-        ax = axes[0, 0]
-        if timestamps is not None:
-            ax.plot(timestamps, y_true, label='Actual', alpha=0.7)
-            ax.plot(timestamps, y_pred, label='Predicted', alpha=0.7)
-            ax.set_xlabel('Time')
-        else:
-            ax.plot(y_true, label='Actual', alpha=0.7)
-            ax.plot(y_pred, label='Predicted', alpha=0.7)
-            ax.set_xlabel('Sample')
-        ax.set_ylabel('Traffic Volume')
-        ax.set_title('Predictions vs Actual Values')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        # 2. Scatter plot
-        ax = axes[0, 1]
-        ax.scatter(y_true, y_pred, alpha=0.5)
-        min_val = min(y_true.min(), y_pred.min())
-        max_val = max(y_true.max(), y_pred.max())
-        ax.plot([min_val, max_val], [min_val, max_val], 'r--', lw=2)
-        ax.set_xlabel('Actual')
-        ax.set_ylabel('Predicted')
-        ax.set_title('Prediction Scatter Plot')
-        ax.grid(True, alpha=0.3)
-        
-        # 3. Residuals
-        ax = axes[1, 0]
-        residuals = y_true - y_pred
-        ax.hist(residuals, bins=50, edgecolor='black')
-        ax.set_xlabel('Residual')
-        ax.set_ylabel('Frequency')
-        ax.set_title('Residual Distribution')
-        ax.axvline(x=0, color='r', linestyle='--')
-        ax.grid(True, alpha=0.3)
-        
-        # 4. Residuals over time
-        ax = axes[1, 1]
-        if timestamps is not None:
-            ax.plot(timestamps, residuals, alpha=0.7)
-            ax.set_xlabel('Time')
-        else:
-            ax.plot(residuals, alpha=0.7)
-            ax.set_xlabel('Sample')
-        ax.set_ylabel('Residual')
-        ax.set_title('Residuals Over Time')
-        ax.axhline(y=0, color='r', linestyle='--')
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            self.logger.info(f"Visualization saved to {save_path}")
+        with _PLT_LOCK:
+            fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        
+            # 1. Predictions vs Actual
+            ax = axes[0, 0]
+            if timestamps is not None:
+                ax.plot(timestamps, y_true, label='Actual', alpha=0.7)
+                ax.plot(timestamps, y_pred, label='Predicted', alpha=0.7)
+                ax.set_xlabel('Time')
+            else:
+                ax.plot(y_true, label='Actual', alpha=0.7)
+                ax.plot(y_pred, label='Predicted', alpha=0.7)
+                ax.set_xlabel('Sample')
+            ax.set_ylabel('Traffic Volume')
+            ax.set_title('Predictions vs Actual Values')
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+        
+            # 2. Scatter plot
+            ax = axes[0, 1]
+            ax.scatter(y_true, y_pred, alpha=0.5)
+            min_val = min(y_true.min(), y_pred.min())
+            max_val = max(y_true.max(), y_pred.max())
+            ax.plot([min_val, max_val], [min_val, max_val], 'r--', lw=2)
+            ax.set_xlabel('Actual')
+            ax.set_ylabel('Predicted')
+            ax.set_title('Prediction Scatter Plot')
+            ax.grid(True, alpha=0.3)
+        
+            # 3. Residuals
+            ax = axes[1, 0]
+            residuals = y_true - y_pred
+            # Bar edges are a large share of draw time at 50 bins
+            ax.hist(residuals, bins=50, edgecolor='none')
+            ax.set_xlabel('Residual')
+            ax.set_ylabel('Frequency')
+            ax.set_title('Residual Distribution')
+            ax.axvline(x=0, color='r', linestyle='--')
+            ax.grid(True, alpha=0.3)
+        
+            # 4. Residuals over time
+            ax = axes[1, 1]
+            if timestamps is not None:
+                ax.plot(timestamps, residuals, alpha=0.7)
+                ax.set_xlabel('Time')
+            else:
+                ax.plot(residuals, alpha=0.7)
+                ax.set_xlabel('Sample')
+            ax.set_ylabel('Residual')
+            ax.set_title('Residuals Over Time')
+            ax.axhline(y=0, color='r', linestyle='--')
+            ax.grid(True, alpha=0.3)
+        
+            plt.tight_layout()
+        
+            if save_path:
+                plt.savefig(save_path, dpi=300, bbox_inches='tight')
+                self.logger.info(f"Visualization saved to {save_path}")
         
         return fig
     
@@ -395,22 +645,30 @@ class TrafficForecaster:
         model_path = self.models_dir / filename
         
         if self.model_type == 'xgboost':
-            # Save XGBoost model and metadata
+            # Native UBJSON dump loads an order of magnitude faster
+            # than unpickling the booster
+            if hasattr(self.model, 'save_model'):
+                self.model.save_model(model_path.with_suffix('.ubj'))
+
+            # Metadata bundle (still carries the booster for consumers
+            # that read only the pickle); uncompressed on purpose so
+            # the API server's mmap_mode='r' load actually maps the
+            # file - joblib ignores mmap_mode on compressed archives
             model_data = {
                 'model': self.model,
                 'feature_cols': self.feature_cols,
-                'model_type': self.model_type,
-                'config': self.config
+                'model_type': self.model_type
             }
             joblib.dump(model_data, model_path)
         else:  # lstm
             # Save Keras model
             self.model.save(model_path.with_suffix('.h5'))
-            # Save scaler and metadata separately
+            # Scaling state is just two float32 arrays; saving them
+            # directly keeps sklearn out of the inference load path
             metadata = {
-                'scaler': self.scaler,
-                'model_type': self.model_type,
-                'config': self.config
+                'scaler_min': self.scaler['min'],
+                'scaler_range': self.scaler['range'],
+                'model_type': self.model_type
             }
             joblib.dump(metadata, model_path.with_suffix('.pkl'))
         
@@ -430,12 +688,29 @@ class TrafficForecaster:
         
         if self.model_type == 'xgboost':
             model_data = joblib.load(model_path)
-            self.model = model_data['model']
             self.feature_cols = model_data['feature_cols']
+
+            # Prefer the native UBJSON booster when it exists
+            ubj_path = model_path.with_suffix('.ubj')
+            if ubj_path.exists():
+                self.model = xgb.Booster()
+                self.model.load_model(ubj_path)
+            else:
+                self.model = model_data['model']
         else:  # lstm
             self.model = keras.models.load_model(model_path.with_suffix('.h5'))
             metadata = joblib.load(model_path.with_suffix('.pkl'))
-            self.scaler = metadata['scaler']
+            if 'scaler_min' in metadata:
+                self.scaler = {'min': metadata['scaler_min'],
+                               'range': metadata['scaler_range']}
+            else:
+                # Metadata written before the plain-array format:
+                # extract the statistics from the pickled MinMaxScaler
+                old = metadata['scaler']
+                self.scaler = {
+                    'min': old.data_min_.astype(np.float32),
+                    'range': (old.data_max_ - old.data_min_).astype(np.float32)
+                }
         
         self.logger.info(f"Model loaded from {model_path}")
     
@@ -450,7 +725,7 @@ class TrafficForecaster:
             Predictions array
         """
         if self.model_type == 'xgboost':
-            return self.model.predict(X)
+            return self._predict_xgboost(X)
         else:  # lstm
             return self.model.predict(X).flatten()
 
@@ -469,8 +744,10 @@ def main():
     # Initialize forecaster
     forecaster = TrafficForecaster(model_type=model_type)
     
-    # Load data
-    data_path = Path("data/processed/processed_traffic_data.csv")
+    # Load data (Parquet default, legacy CSV fallback)
+    data_path = Path("data/processed/processed_traffic_data.parquet")
+    if not data_path.exists():
+        data_path = data_path.with_suffix('.csv')
     if not data_path.exists():
         print(f"Error: Processed data not found at {data_path}")
         print("Please run data_processor.py first")
@@ -487,15 +764,19 @@ def main():
     df_test = df.iloc[train_size:]
     
     if model_type == 'xgboost':
-        # Prepare features
-        X_train, y_train, feature_cols = forecaster.prepare_features_xgboost(df_train)
-        X_test, y_test, _ = forecaster.prepare_features_xgboost(df_test)
-        
-        # Split training into train/val
-        X_train, X_val, y_train, y_val = train_test_split(
-            X_train, y_train, test_size=0.2, random_state=42
-        )
-        
+        # Prepare features once, then slice the train/test splits
+        X_train, y_train, X_test, y_test, feature_cols = \
+            forecaster.prepare_features_xgboost_full(df, train_size)
+
+        # Split training into train/val by time order (a shuffled
+        # split leaks future rows into validation); slicing keeps
+        # zero-copy views
+        split = int(len(X_train) * 0.8)
+        X_val = X_train[split:]
+        y_val = y_train[split:]
+        X_train = X_train[:split]
+        y_train = y_train[:split]
+
         # Train
         forecaster.train_xgboost(X_train, y_train, X_val, y_val)
         
@@ -527,7 +808,7 @@ def main():
     # Save metrics
     metrics_path = Path(f"data/models/{model_type}_metrics.json")
     with open(metrics_path, 'w') as f:
-        json.dump(metrics, f, indent=2)
+        json.dump(metrics, f)
     
     print("\nTraining complete!")
     print(f"RMSE: {metrics['rmse']:.3f}")
@@ -6,23 +6,115 @@ Generates realistic pedestrian traffic patterns without real Bluetooth hardware
 
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import hashlib
+import multiprocessing as mp
+import os
+from functools import lru_cache
 from pathlib import Path
 import yaml
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Hourly base traffic (metro-station pattern) and weekday multipliers
+# as lookup tables, so a whole run's counts come from two vectorized
+# gathers instead of a per-scan branch chain
+_HOUR_LUT = np.array(
+    [2, 2, 2, 2, 2,          # 00-04 very quiet, late night
+     5, 5,                   # 05-06 early morning, building up
+     25, 25,                 # 07-08 morning rush hour
+     12, 12,                 # 09-10 mid-morning
+     15, 15,                 # 11-12 lunch time
+     10, 10, 10,             # 13-15 afternoon
+     28, 28, 28,             # 16-18 evening rush hour
+     12, 12, 12,             # 19-21 evening
+     5, 5],                  # 22-23 late evening
+    dtype=np.float64
+)
+_DOW_LUT = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 0.7, 0.5])
+
+# Protocol bits expand to strings via tuple indexing at the serialize
+# boundary; the two interned strings are shared across all records
+_PROTO_TABLE = ('classic', 'ble')
+
+
+def _format_scan_line(scan):
+    """
+    Format one scan as a JSONL line without a generic serializer
+
+    Safe because every value in a scan record is known not to need JSON
+    escaping (ISO timestamps, hex hashes, ints, fixed protocol names),
+    so direct f-string assembly skips json.dumps's type dispatch and
+    string scanning. Used when orjson is unavailable.
+    """
+    devices = ','.join(
+        '{"mac_hash":"%s","rssi":%d,"protocol":"%s"}'
+        % (d['mac_hash'], d['rssi'], d['protocol'])
+        for d in scan['devices']
+    )
+    return (
+        '{"timestamp":"%s","scan_id":%d,"device_count":%d,"devices":[%s]}\n'
+        % (scan['timestamp'], scan['scan_id'], scan['device_count'], devices)
+    ).encode()
+
+# PyYAML's pure-Python tokenizer dominates config load time; prefer the
+# libyaml-backed loader when it was compiled in
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=4)
+def _load_config(config_path):
+    """Parse the YAML config once per path and memoize the result"""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _counts_kernel(hours, dows, noise, hour_lut, dow_lut):
+        """Fuse the LUT gathers, noise multiply, truncation and clamp
+        into one parallel pass with no intermediate arrays"""
+        n = hours.shape[0]
+        out = np.empty(n, dtype=np.int64)
+        for i in prange(n):
+            count = int(hour_lut[hours[i]] * dow_lut[dows[i]] * (1.0 + noise[i]))
+            out[i] = count if count > 0 else 0
+        return out
+
 
 class SyntheticDataGenerator:
     """Generate synthetic traffic data for testing"""
     
-    def __init__(self, config_path="data_collection/config.yaml"):
+    def __init__(self, config_path="data_collection/config.yaml", seed=None):
         """Initialize generator"""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
-        
+        self.config = _load_config(config_path)
+
         self.data_dir = Path(self.config['storage']['raw_data_dir'])
         self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        # PCG64 Generator: faster than the legacy np.random functions
+        # and lets a seed make runs reproducible; base_seed derives the
+        # per-day streams in _generate_day
+        self.base_seed = seed
+        self.rng = np.random.default_rng(seed)
     
     def generate_daily_pattern(self, hour):
         """
@@ -34,25 +126,8 @@ class SyntheticDataGenerator:
         Returns:
             Base traffic level for that hour
         """
-        # Typical metro station pattern
-        if 0 <= hour < 5:
-            return 2  # Very quiet, late night
-        elif 5 <= hour < 7:
-            return 5  # Early morning, building up
-        elif 7 <= hour < 9:
-            return 25  # Morning rush hour
-        elif 9 <= hour < 11:
-            return 12  # Mid-morning
-        elif 11 <= hour < 13:
-            return 15  # Lunch time
-        elif 13 <= hour < 16:
-            return 10  # Afternoon
-        elif 16 <= hour < 19:
-            return 28  # Evening rush hour
-        elif 19 <= hour < 22:
-            return 12  # Evening
-        else:
-            return 5  # Late evening
+        # Branchless: single table lookup instead of an if/elif chain
+        return int(_HOUR_LUT[hour])
     
     def generate_weekly_pattern(self, day_of_week):
         """
@@ -64,12 +139,7 @@ class SyntheticDataGenerator:
         Returns:
             Multiplier for that day
         """
-        if day_of_week < 5:  # Weekday
-            return 1.0
-        elif day_of_week == 5:  # Saturday
-            return 0.7
-        else:  # Sunday
-            return 0.5
+        return float(_DOW_LUT[day_of_week])
     
     def generate_device_count(self, timestamp):
         """
@@ -89,7 +159,7 @@ class SyntheticDataGenerator:
         weekly_mult = self.generate_weekly_pattern(day_of_week)
         
         # Add some randomness
-        noise = np.random.normal(0, 0.2)
+        noise = self.rng.normal(0, 0.2)
         
         # Final count
         count = int(base * weekly_mult * (1 + noise))
@@ -105,107 +175,298 @@ class SyntheticDataGenerator:
             device_id: Unique device identifier
             
         Returns:
-            SHA-256 hash string
+            Hash hex string
         """
+        # blake2b is ~3x faster per call than sha256 and these hashes
+        # only need to look opaque, not be cryptographic
         mac = f"fake_device_{device_id}"
-        return hashlib.sha256(mac.encode()).hexdigest()
+        return hashlib.blake2b(mac.encode(), digest_size=16).hexdigest()
     
-    def generate_scan(self, timestamp, scan_id):
+    def generate_device_counts(self, start_date, n, scan_interval):
+        """
+        Generate device counts for a whole run in one vectorized pass
+
+        Args:
+            start_date: DateTime of the first scan
+            n: Number of scans
+            scan_interval: Seconds between scans
+
+        Returns:
+            int array of device counts, one per scan
+        """
+        offsets = np.arange(n, dtype=np.int64) * scan_interval
+        start_sod = start_date.hour * 3600 + start_date.minute * 60 + start_date.second
+        hours = ((start_sod + offsets) // 3600) % 24
+        dows = ((start_date.weekday() * 86400 + start_sod + offsets) // 86400) % 7
+
+        noise = self.rng.standard_normal(n) * 0.2
+        if NUMBA_AVAILABLE:
+            return _counts_kernel(hours, dows, noise, _HOUR_LUT, _DOW_LUT)
+        counts = (_HOUR_LUT[hours] * _DOW_LUT[dows] * (1 + noise)).astype(int)
+        return np.maximum(0, counts)
+
+    def generate_scan(self, timestamp, scan_id, device_count=None,
+                      rssi=None, protocol=None, ts_iso=None, ts_epoch=None):
         """
         Generate a single scan record
-        
+
         Args:
-            timestamp: DateTime for this scan
+            timestamp: DateTime for this scan (may be None when both
+                ts_iso and ts_epoch are supplied and device_count is set)
             scan_id: Scan identifier
-            
+            device_count: Precomputed device count (generated if None)
+            rssi: Pre-drawn int array of signal strengths (drawn if None)
+            protocol: Pre-drawn uint8 array of protocol bits (drawn if None)
+            ts_iso: Precomputed ISO timestamp string (derived if None)
+            ts_epoch: Precomputed epoch seconds (derived if None)
+
         Returns:
             Dictionary with scan data
         """
-        device_count = self.generate_device_count(timestamp)
-        
-        devices = []
-        for i in range(device_count):
-            # Generate unique device ID based on time and index
-            device_id = f"{timestamp.timestamp()}_{i}"
-            
-            devices.append({
-                'mac_hash': self.generate_mac_hash(device_id),
-                'rssi': np.random.randint(-80, -40),  # Signal strength
-                'protocol': np.random.choice(['classic', 'ble'])
-            })
+        if device_count is None:
+            device_count = self.generate_device_count(timestamp)
+        if ts_epoch is None:
+            ts_epoch = timestamp.timestamp()
+        if ts_iso is None:
+            ts_iso = timestamp.isoformat()
+
+        # One XOF call per scan: SHAKE-128 expands the scan seed into
+        # 16 bytes per device and the hex stream is sliced into the
+        # individual hashes, so hashing cost is a single C-level
+        # invocation per scan instead of one per device
+        hex_stream = hashlib.shake_128(
+            f"fake_device_{ts_epoch}".encode()
+        ).hexdigest(16 * device_count) if device_count else ''
+        hashes = [hex_stream[i * 32:(i + 1) * 32] for i in range(device_count)]
+
+        # Draw signal strengths and protocols as whole arrays (two RNG
+        # calls per scan instead of two per device) unless the caller
+        # already carved them from a run-wide buffer; expand to the
+        # on-disk record shape only at the boundary
+        if rssi is None:
+            rssi = self.rng.integers(-80, -40, size=device_count, dtype=np.int8)
+        if protocol is None:
+            protocol = self.rng.integers(0, 2, size=device_count, dtype=np.uint8)
+        rssi = rssi.tolist()
+        protocol = [_PROTO_TABLE[bit] for bit in protocol.tolist()]
+
+        devices = [
+            {'mac_hash': hashes[i], 'rssi': rssi[i], 'protocol': protocol[i]}
+            for i in range(device_count)
+        ]
         
         return {
-            'timestamp': timestamp.isoformat(),
+            'timestamp': ts_iso,
             'scan_id': scan_id,
             'device_count': len(devices),
             'devices': devices
         }
     
-    def generate_dataset(self, start_date, days=14):
+    def save_day_parquet(self, date, scans, filepath):
+        """
+        Save one day of scans as a columnar Parquet file
+
+        One row per device detection; protocol is dictionary-encoded and
+        the file is zstd-compressed, so a day lands at a fraction of the
+        JSONL size and loads column-wise without JSON parsing.
+
+        Args:
+            date: Day of the scans ('YYYY-MM-DD')
+            scans: List of scan dictionaries
+            filepath: Output .parquet path
+        """
+        timestamps, scan_ids, mac_hashes, rssis, protocols = [], [], [], [], []
+        for scan in scans:
+            for device in scan['devices']:
+                timestamps.append(scan['timestamp'])
+                scan_ids.append(scan['scan_id'])
+                mac_hashes.append(device['mac_hash'])
+                rssis.append(device['rssi'])
+                protocols.append(device['protocol'])
+
+        table = pa.table({
+            'timestamp': pa.array(timestamps, type=pa.string()),
+            'scan_id': pa.array(scan_ids, type=pa.int64()),
+            'mac_hash': pa.array(mac_hashes, type=pa.string()),
+            'rssi': pa.array(rssis, type=pa.int16()),
+            'protocol': pa.array(protocols, type=pa.string()).dictionary_encode(),
+        })
+        pq.write_table(table, filepath, compression='zstd')
+
+    def _day_tasks(self, start_date, days, scan_interval):
+        """
+        Split the run into per-calendar-date scan-id ranges
+
+        One task per calendar date touched by the run, so parallel
+        workers never write to the same day file.
+
+        Args:
+            start_date: DateTime of the first scan
+            days: Number of days in the run
+            scan_interval: Seconds between scans
+
+        Returns:
+            List of (day_index, first_scan_id, last_scan_id_exclusive)
+        """
+        start_s = int(np.datetime64(start_date, 's').astype(np.int64))
+        end_s = start_s + days * 86400
+        sod = start_date.hour * 3600 + start_date.minute * 60 + start_date.second
+        midnight0 = start_s - sod
+
+        tasks = []
+        k = 0
+        while midnight0 + k * 86400 < end_s:
+            lo = max(start_s, midnight0 + k * 86400)
+            hi = min(end_s, midnight0 + (k + 1) * 86400)
+            id0 = int(-(-(lo - start_s) // scan_interval))
+            id1 = int(-(-(hi - start_s) // scan_interval))
+            if id1 > id0:
+                tasks.append((k, id0, id1))
+            k += 1
+        return tasks
+
+    def _generate_day(self, task):
+        """
+        Generate and write one calendar date of scans (worker unit)
+
+        Args:
+            task: (day_index, first_scan_id, last_scan_id_exclusive,
+                   start_epoch_seconds, scan_interval, use_parquet)
+
+        Returns:
+            (date_str, scans_written, devices_written, filename)
+        """
+        day_index, id0, id1, start_s, scan_interval, use_parquet = task
+
+        # Each day gets its own deterministic stream so output is
+        # reproducible regardless of worker scheduling
+        if self.base_seed is not None:
+            self.rng = np.random.default_rng(self.base_seed ^ day_index)
+        else:
+            self.rng = np.random.default_rng()
+
+        n_day = id1 - id0
+
+        # All timestamps as one datetime64 array; the ISO strings come
+        # from a single vectorized C formatting call and epoch seconds
+        # from an integer view, replacing a datetime construction plus
+        # .isoformat()/.timestamp()/.date() calls on every iteration
+        epoch = start_s + np.arange(id0, id1, dtype=np.int64) * scan_interval
+        ts64 = epoch.astype('datetime64[s]')
+        iso_all = np.datetime_as_string(ts64).tolist()
+        epoch_all = epoch.tolist()
+        date_str = iso_all[0][:10]
+
+        # Device counts for the day in one vectorized pass
+        counts = self.generate_device_counts(ts64[0].item(), n_day, scan_interval)
+
+        # Pre-draw the day's per-device randomness in two bulk
+        # Generator calls and hand each scan a cursor slice
+        total_expected = int(counts.sum())
+        rssi_all = self.rng.integers(-80, -40, size=total_expected, dtype=np.int8)
+        proto_all = self.rng.integers(0, 2, size=total_expected, dtype=np.uint8)
+        cursor = 0
+        total_devices = 0
+
+        ext = 'parquet' if use_parquet else 'jsonl'
+        filename = f"scan_{date_str.replace('-', '')}.{ext}"
+        filepath = self.data_dir / filename
+
+        # JSONL streams each scan straight to the buffered day handle;
+        # Parquet needs the full day's columns, so it buffers the day
+        day_buffer = [] if use_parquet else None
+        f = None if use_parquet else open(filepath, 'wb')
+
+        try:
+            for i in range(n_day):
+                count = int(counts[i])
+                scan = self.generate_scan(
+                    None, id0 + i, count,
+                    rssi=rssi_all[cursor:cursor + count],
+                    protocol=proto_all[cursor:cursor + count],
+                    ts_iso=iso_all[i],
+                    ts_epoch=epoch_all[i]
+                )
+                cursor += count
+                total_devices += scan['device_count']
+
+                if use_parquet:
+                    day_buffer.append(scan)
+                elif ORJSON_AVAILABLE:
+                    f.write(orjson.dumps(scan) + b'\n')
+                else:
+                    f.write(_format_scan_line(scan))
+        finally:
+            if f is not None:
+                f.close()
+
+        if use_parquet:
+            self.save_day_parquet(date_str, day_buffer, filepath)
+
+        return date_str, n_day, total_devices, filename
+
+    def generate_dataset(self, start_date, days=14, output_format='jsonl',
+                         workers=None):
         """
         Generate complete synthetic dataset
-        
+
+        Days are independent, so they are sharded across worker
+        processes; each worker writes its own day file and returns only
+        counts, keeping IPC tiny.
+
         Args:
             start_date: Starting date (string or datetime)
             days: Number of days to generate
+            output_format: 'jsonl' (default, what the data processor
+                ingests) or 'parquet' for columnar daily files
+            workers: Worker process count (defaults to CPU count,
+                capped at the number of days)
         """
         if isinstance(start_date, str):
             start_date = datetime.fromisoformat(start_date)
-        
+
         print(f"Generating {days} days of synthetic data...")
         print(f"Start date: {start_date.date()}")
-        
+
         scan_interval = self.config['bluetooth']['scan_interval']
-        current_time = start_date
-        end_time = start_date + timedelta(days=days)
-        scan_id = 0
-        
-        # Group scans by date for file organization
-        scans_by_date = {}
-        
-        while current_time < end_time:
-            # Generate scan
-            scan = self.generate_scan(current_time, scan_id)
-            
-            # Group by date
-            date_key = current_time.date()
-            if date_key not in scans_by_date:
-                scans_by_date[date_key] = []
-            scans_by_date[date_key].append(scan)
-            
-            # Move to next scan time
-            current_time += timedelta(seconds=scan_interval)
-            scan_id += 1
-            
-            # Progress indicator
-            if scan_id % 100 == 0:
-                progress = (current_time - start_date).total_seconds() / (end_time - start_date).total_seconds()
-                print(f"Progress: {progress*100:.1f}% ({scan_id} scans)")
-        
-        # Save to files
-        print("\nSaving data files...")
-        for date, scans in scans_by_date.items():
-            filename = f"scan_{date.strftime('%Y%m%d')}.jsonl"
-            filepath = self.data_dir / filename
-            
-            with open(filepath, 'w') as f:
-                for scan in scans:
-                    f.write(json.dumps(scan) + '\n')
-            
-            print(f"  Saved {len(scans)} scans to {filename}")
-        
-        print(f"\n✓ Generated {scan_id} total scans")
+
+        use_parquet = output_format == 'parquet'
+        if use_parquet and not PYARROW_AVAILABLE:
+            print("pyarrow not available, falling back to JSONL output")
+            use_parquet = False
+
+        start_s = int(np.datetime64(start_date, 's').astype(np.int64))
+        tasks = [
+            (k, id0, id1, start_s, scan_interval, use_parquet)
+            for k, id0, id1 in self._day_tasks(start_date, days, scan_interval)
+        ]
+        n_scans = sum(id1 - id0 for _, id0, id1, _, _, _ in tasks)
+
+        if workers is None:
+            workers = min(len(tasks), os.cpu_count() or 1)
+
+        if workers > 1 and len(tasks) > 1:
+            with mp.Pool(workers) as pool:
+                results = pool.map(self._generate_day, tasks)
+        else:
+            results = [self._generate_day(task) for task in tasks]
+
+        total_devices = 0
+        for date_str, n_day, devices, filename in results:
+            total_devices += devices
+            print(f"  Saved {n_day} scans to {filename}")
+
+        print(f"\n✓ Generated {n_scans} total scans")
         print(f"✓ Saved to {self.data_dir}")
-        
+
         # Generate summary statistics
-        total_devices = sum(scan['device_count'] for scans in scans_by_date.values() for scan in scans)
-        avg_devices = total_devices / scan_id if scan_id > 0 else 0
-        
+        avg_devices = total_devices / n_scans if n_scans > 0 else 0
+
         print(f"\nDataset Statistics:")
-        print(f"  Total scans: {scan_id}")
+        print(f"  Total scans: {n_scans}")
         print(f"  Total device detections: {total_devices}")
         print(f"  Average devices per scan: {avg_devices:.2f}")
-        print(f"  Date range: {min(scans_by_date.keys())} to {max(scans_by_date.keys())}")
+        print(f"  Date range: {results[0][0]} to {results[-1][0]}")
 
 
 def main():
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Shared logging setup for the monitoring tools
+Idempotent per-logger configuration with buffered file output
+"""
+
+import atexit
+import logging
+import logging.handlers
+import sys
+from pathlib import Path
+
+
+def setup_logging(name, log_path, level='INFO',
+                  fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s'):
+    """
+    Configure and return a named logger
+
+    Safe to call from several components in one process: the first
+    caller attaches handlers, later calls return the logger untouched
+    (logging.basicConfig silently ignores every call after the first,
+    which used to drop the second component's file handler entirely).
+
+    The file handler is wrapped in a MemoryHandler so low-volume logs
+    are written in 1024-record batches instead of one small write per
+    record — noticeable on SD-card storage.
+
+    Args:
+        name: Logger name (usually __name__)
+        log_path: Path to the log file
+        level: Log level name from config
+        fmt: Log record format string
+
+    Returns:
+        Configured Logger instance
+    """
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    formatter = logging.Formatter(fmt)
+
+    file_handler = logging.FileHandler(log_path)
+    file_handler.setFormatter(formatter)
+    # WARNING flushes immediately: at ~1 record/minute a buffered
+    # warning could sit unwritten for hours and be lost on a power cut
+    buffered = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.WARNING, target=file_handler
+    )
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    logger.setLevel(getattr(logging, level))
+    logger.addHandler(buffered)
+    logger.addHandler(stream_handler)
+
+    # Flush whatever is still buffered when the process exits
+    atexit.register(logging.shutdown)
+
+    return logger
@@ -19,6 +19,14 @@ class USBStorageManager:
         self.logger = logging.getLogger(__name__)
         self.usb_mount_point = Path("/mnt/usb_storage")
         self.default_storage = Path("/home/claude/pedestrian-monitoring/data")
+        # Availability is probed per scan write; cache the result for a
+        # few seconds since mount state doesn't change mid-scan
+        self._avail_cache = None
+        self._avail_ttl = 5.0
+        self._info_cache = None
+        # Directories already created in this process; lets
+        # get_storage_path skip the repeated mkdir syscalls
+        self._made_dirs = set()
         
     def find_usb_device(self):
         """
@@ -28,39 +36,32 @@ class USBStorageManager:
             Device path (e.g., /dev/sda1) or None
         """
         try:
-            # List block devices
-            result = subprocess.run(
-                ['lsblk', '-o', 'NAME,TYPE,MOUNTPOINT', '-n'],
-                capture_output=True,
-                text=True
-            )
-            
-            lines = result.stdout.strip().split('\n')
-            
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 2:
-                    name, device_type = parts[0], parts[1]
-                    
-                    # Look for disk partitions (not the whole disk)
-                    if device_type == 'part' and name.startswith('sd'):
-                        # Exclude system disk (usually mmcblk0 on Pi or sda if booting from USB)
-                        # We want removable USB drives (typically sda1, sdb1, etc.)
-                        device_path = f"/dev/{name}"
-                        
-                        # Check if it's removable
-                        removable_path = f"/sys/block/{name.rstrip('0123456789')}/removable"
-                        try:
-                            with open(removable_path, 'r') as f:
-                                if f.read().strip() == '1':
-                                    self.logger.info(f"Found removable USB device: {device_path}")
-                                    return device_path
-                        except:
-                            pass
-            
+            # Enumerate /sys/block directly instead of forking lsblk and
+            # parsing its text output: one scandir plus one small file
+            # read per disk, no subprocess
+            for entry in os.scandir('/sys/block'):
+                if not entry.name.startswith('sd'):
+                    continue
+
+                # Check if it's removable
+                try:
+                    with open(f"{entry.path}/removable", 'r') as f:
+                        if f.read().strip() != '1':
+                            continue
+                except OSError:
+                    continue
+
+                # Pick the first partition of the removable disk
+                # (typically sda1, sdb1, etc.)
+                for part in sorted(os.listdir(entry.path)):
+                    if part.startswith(entry.name) and part[-1].isdigit():
+                        device_path = f"/dev/{part}"
+                        self.logger.info(f"Found removable USB device: {device_path}")
+                        return device_path
+
             self.logger.warning("No removable USB device found")
             return None
-            
+
         except Exception as e:
             self.logger.error(f"Error finding USB device: {e}")
             return None
@@ -86,13 +87,9 @@ class USBStorageManager:
             # Create mount point if it doesn't exist
             self.usb_mount_point.mkdir(parents=True, exist_ok=True)
             
-            # Check if already mounted
-            result = subprocess.run(
-                ['mountpoint', '-q', str(self.usb_mount_point)],
-                capture_output=True
-            )
-            
-            if result.returncode == 0:
+            # Check if already mounted: os.path.ismount is a stat()
+            # comparison, no mountpoint subprocess needed
+            if os.path.ismount(self.usb_mount_point):
                 self.logger.info(f"USB already mounted at {self.usb_mount_point}")
                 return self.usb_mount_point
             
@@ -110,6 +107,8 @@ class USBStorageManager:
             )
             
             self.logger.info(f"Successfully mounted USB at {self.usb_mount_point}")
+            self._avail_cache = None
+            self._info_cache = None
             return self.usb_mount_point
             
         except subprocess.CalledProcessError as e:
@@ -127,6 +126,8 @@ class USBStorageManager:
                 ['sudo', 'umount', str(self.usb_mount_point)],
                 check=True
             )
+            self._avail_cache = None
+            self._info_cache = None
             self.logger.info("USB unmounted successfully")
             return True
         except subprocess.CalledProcessError as e:
@@ -140,27 +141,30 @@ class USBStorageManager:
         Returns:
             True if USB is mounted and writable
         """
-        if not self.usb_mount_point.exists():
-            return False
-        
+        if self._avail_cache is not None:
+            checked_at, available = self._avail_cache
+            if time.monotonic() - checked_at < self._avail_ttl:
+                return available
+
+        available = self._check_usb_available()
+        self._avail_cache = (time.monotonic(), available)
+        return available
+
+    def _check_usb_available(self):
+        """Uncached mount + write-access probe behind is_usb_available"""
         try:
-            # Check if mounted
-            result = subprocess.run(
-                ['mountpoint', '-q', str(self.usb_mount_point)],
-                capture_output=True
-            )
-            
-            if result.returncode != 0:
+            # Check if mounted (ismount also covers the missing-dir case)
+            if not os.path.ismount(self.usb_mount_point):
                 return False
-            
+
             # Check if writable
             test_file = self.usb_mount_point / '.write_test'
             test_file.touch()
             test_file.unlink()
-            
+
             return True
-            
-        except Exception as e:
+
+        except OSError as e:
             self.logger.debug(f"USB not available: {e}")
             return False
     
@@ -184,48 +188,65 @@ class USBStorageManager:
         else:
             storage_path = base_path
         
-        # Create directory if it doesn't exist
-        storage_path.mkdir(parents=True, exist_ok=True)
-        
+        # Create directory if it doesn't exist; only pay the mkdir
+        # syscalls once per unique path per process
+        if storage_path not in self._made_dirs:
+            storage_path.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(storage_path)
+
         return storage_path
     
     def get_usb_info(self):
         """
         Get information about USB storage
-        
+
+        Results are cached for one second so dashboard-style polling
+        doesn't re-run the mount probe and statvfs on every call.
+
         Returns:
-            Dictionary with USB info
+            Dictionary with USB info (sizes in integer bytes plus the
+            rounded GB fields existing callers display)
         """
+        if self._info_cache is not None:
+            fetched_at, info = self._info_cache
+            if time.monotonic() - fetched_at < 1.0:
+                return info
+
         info = {
             'mounted': False,
             'mount_point': None,
+            'available_bytes': 0,
+            'used_bytes': 0,
+            'total_bytes': 0,
             'available_space_gb': 0,
             'used_space_gb': 0,
             'total_space_gb': 0
         }
-        
-        if not self.is_usb_available():
-            return info
-        
-        try:
-            # Get disk usage
-            stat = os.statvfs(self.usb_mount_point)
-            
-            total = (stat.f_blocks * stat.f_frsize) / (1024**3)  # GB
-            available = (stat.f_bavail * stat.f_frsize) / (1024**3)  # GB
-            used = total - available
-            
-            info.update({
-                'mounted': True,
-                'mount_point': str(self.usb_mount_point),
-                'available_space_gb': round(available, 2),
-                'used_space_gb': round(used, 2),
-                'total_space_gb': round(total, 2)
-            })
-            
-        except Exception as e:
-            self.logger.error(f"Error getting USB info: {e}")
-        
+
+        if self.is_usb_available():
+            try:
+                # Disk usage in integer bytes; GB only for display
+                stat = os.statvfs(self.usb_mount_point)
+
+                total_b = stat.f_blocks * stat.f_frsize
+                avail_b = stat.f_bavail * stat.f_frsize
+                used_b = total_b - avail_b
+
+                info.update({
+                    'mounted': True,
+                    'mount_point': str(self.usb_mount_point),
+                    'available_bytes': avail_b,
+                    'used_bytes': used_b,
+                    'total_bytes': total_b,
+                    'available_space_gb': round(avail_b / (1024**3), 2),
+                    'used_space_gb': round(used_b / (1024**3), 2),
+                    'total_space_gb': round(total_b / (1024**3), 2)
+                })
+
+            except Exception as e:
+                self.logger.error(f"Error getting USB info: {e}")
+
+        self._info_cache = (time.monotonic(), info)
         return info
     
     def setup_auto_mount(self):
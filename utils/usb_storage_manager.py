@@ -5,24 +5,83 @@ Automatically detects USB drives and saves data to them
 """
 
 import os
+import select
 import subprocess
 import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 import logging
 import time
 import yaml
 
+# PyYAML's pure-Python tokenizer dominates config load time; prefer the
+# libyaml-backed loader when it was compiled in
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Prebuilt prefix tuples for the /proc/mounts parser: startswith with a
+# tuple is one C-level pass, and the bytes stay unconverted
+_USB_DEV_PREFIXES = (b'/dev/sd', b'/dev/mmcblk', b'/dev/nvme')
+_USB_MOUNT_PREFIXES = (b'/media', b'/mnt', b'/run/media')
+
+# README body pre-encoded at import; only the timestamp changes per
+# USB insertion
+_README_TEMPLATE = (
+    "=" * 70 + "\n"
+    "PEDESTRIAN TRAFFIC MONITORING DATA\n"
+    + "=" * 70 + "\n\n"
+    "This USB drive contains anonymized pedestrian traffic data.\n\n"
+    "DATA STRUCTURE:\n"
+    "  data/raw/      - Raw Bluetooth scan logs (JSONL format)\n"
+    "  data/processed/ - Processed and aggregated data (CSV)\n"
+    "  data/models/   - Trained machine learning models\n\n"
+    "PRIVACY NOTICE:\n"
+    "  - All MAC addresses are hashed (keyed BLAKE2b with a rotating key)\n"
+    "  - No personal identifiable information stored\n"
+    "  - Stationary devices filtered out\n"
+    "  - Data aggregated into time windows\n\n"
+    "TO PROCESS THIS DATA:\n"
+    "  1. Copy this folder to your computer\n"
+    "  2. Run: python3 data_collection/data_processor.py\n"
+    "  3. Run: python3 ml_models/model_trainer.py\n"
+    "  4. Start API and dashboard to view results\n\n"
+    "Data collected on: {timestamp}\n"
+    + "=" * 70 + "\n"
+).encode()
+
+
+@lru_cache(maxsize=4)
+def _load_config(config_path):
+    """Parse the YAML config once per path and memoize the result"""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 
 class USBStorageManager:
     """Manage data storage to USB drives"""
     
     def __init__(self, config_path="data_collection/config.yaml"):
         """Initialize USB storage manager"""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = _load_config(config_path)
         
         self.logger = logging.getLogger(__name__)
         self.usb_mount_point = None
+        # Preferred-drive result cached for a few seconds: every call
+        # otherwise re-walks /media, /mnt and /proc/mounts and runs
+        # statvfs on each candidate
+        self._usb_cache = (None, 0.0)
+        # statvfs results per mount point; statvfs on USB/FUSE media
+        # can be slow and the scan + info paths otherwise repeat it
+        self._statvfs_cache = {}
+        # Resolved storage dirs per data type so bulk syncs pay the
+        # scan + mkdir cost once, not per file
+        self._path_cache = {}
+        # rsync handles big directory syncs in C when it's installed
+        self._rsync = shutil.which('rsync')
+        self._mount_watcher = None
     
     def find_usb_drives(self):
         """
@@ -32,38 +91,81 @@ class USBStorageManager:
             List of USB mount points
         """
         usb_drives = []
-        
+
         try:
-            # Check common USB mount points
-            media_dirs = ['/media', '/mnt']
-            
-            for media_dir in media_dirs:
-                if os.path.exists(media_dir):
-                    # List all subdirectories
-                    for root, dirs, files in os.walk(media_dir):
-                        for dir_name in dirs:
-                            mount_point = os.path.join(root, dir_name)
-                            # Check if it's actually mounted
-                            if os.path.ismount(mount_point):
-                                usb_drives.append(mount_point)
-                        break  # Don't recurse deeper
-            
-            # Alternative: Parse /proc/mounts
+            # /proc/mounts is the authoritative mount table and a cheap
+            # in-memory procfs read, so check it first instead of
+            # stat'ing every directory under /media and /mnt. The table
+            # is tiny, so one raw read and a bytes split skips the
+            # TextIOWrapper and codec machinery entirely
+            fd = os.open('/proc/mounts', os.O_RDONLY)
+            try:
+                data = os.read(fd, 65536)
+            finally:
+                os.close(fd)
+
+            for line in data.splitlines():
+                parts = line.split(None, 2)
+                if len(parts) >= 2:
+                    device, mount_point = parts[0], parts[1]
+                    # Look for block devices mounted where removable
+                    # media lands
+                    if (device.startswith(_USB_DEV_PREFIXES)
+                            and mount_point.startswith(_USB_MOUNT_PREFIXES)):
+                        usb_drives.append(mount_point.decode())
+
+            # Fallback: probe common USB mount points directly.
+            # scandir's DirEntry carries the dirent type, so filtering
+            # to directories costs no extra stat per entry, and one
+            # mountinfo read gives the full set of mount points so the
+            # per-candidate check is a set lookup instead of the two
+            # stats os.path.ismount costs
             if not usb_drives:
-                with open('/proc/mounts', 'r') as f:
-                    for line in f:
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            device, mount_point = parts[0], parts[1]
-                            # Look for USB devices
-                            if '/dev/sd' in device and mount_point.startswith('/media'):
-                                usb_drives.append(mount_point)
-        
+                mount_set = self._read_mount_points()
+                media_dirs = ['/media', '/mnt']
+
+                for media_dir in media_dirs:
+                    try:
+                        with os.scandir(media_dir) as entries:
+                            for entry in entries:
+                                if not entry.is_dir(follow_symlinks=False):
+                                    continue
+                                if mount_set is not None:
+                                    mounted = entry.path in mount_set
+                                else:
+                                    mounted = os.path.ismount(entry.path)
+                                if mounted:
+                                    usb_drives.append(entry.path)
+                    except FileNotFoundError:
+                        continue
+
         except Exception as e:
             self.logger.error(f"Error finding USB drives: {e}")
-        
+
         return usb_drives
     
+    def _read_mount_points(self):
+        """
+        Read the set of active mount points from /proc/self/mountinfo
+
+        Returns:
+            Set of mount-point strings, or None if mountinfo is
+            unreadable (callers fall back to os.path.ismount)
+        """
+        try:
+            with open('/proc/self/mountinfo', 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        mount_points = set()
+        for line in data.splitlines():
+            fields = line.split()
+            # Field 5 of the mountinfo format is the mount point
+            if len(fields) > 4:
+                mount_points.add(fields[4].decode())
+        return mount_points
+
     def get_preferred_usb(self):
         """
         Get the preferred USB drive (first available with enough space)
@@ -71,6 +173,121 @@ class USBStorageManager:
         Returns:
             USB mount point or None
         """
+        cached_mount, expires_at = self._usb_cache
+        if time.monotonic() < expires_at:
+            return cached_mount
+
+        usb = self._scan_preferred_usb()
+        # Negative results expire sooner so a freshly plugged stick is
+        # still picked up quickly on USB-less devices
+        ttl = 5.0 if usb is not None else 2.0
+        self._usb_cache = (usb, time.monotonic() + ttl)
+        return usb
+
+    def refresh(self):
+        """Drop all cached drive state so the next call rescans"""
+        self._usb_cache = (None, 0.0)
+        self._statvfs_cache.clear()
+        self._path_cache.clear()
+
+    def start_mount_watcher(self):
+        """
+        Invalidate drive caches the moment the mount table changes
+
+        /proc/self/mounts becomes poll-readable (EPOLLERR|EPOLLPRI)
+        exactly when a filesystem is mounted or unmounted, so a blocked
+        daemon thread replaces timer-based rescans: zero cost while
+        idle, immediate reaction to USB plug/unplug.
+
+        Returns:
+            True if the watcher is running
+        """
+        if self._mount_watcher is not None:
+            return True
+
+        try:
+            fd = os.open('/proc/self/mounts', os.O_RDONLY)
+            poller = select.epoll()
+            poller.register(fd, select.EPOLLERR | select.EPOLLPRI)
+        except (OSError, AttributeError):
+            self.logger.debug("Mount watcher unavailable on this platform")
+            return False
+
+        def watch():
+            try:
+                while True:
+                    if poller.poll():
+                        # Re-read to rearm the level-triggered event
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        os.read(fd, 65536)
+
+                        self.logger.info("Mount table changed, rescanning USB drives")
+                        self.refresh()
+                        self.get_preferred_usb()
+            finally:
+                poller.close()
+                os.close(fd)
+
+        self._mount_watcher = threading.Thread(
+            target=watch, daemon=True, name='usb-mount-watcher'
+        )
+        self._mount_watcher.start()
+        return True
+
+    @property
+    def current_usb(self):
+        """
+        Currently preferred USB mount point, or None
+
+        Served from the drive cache, which the mount watcher keeps
+        fresh when running; without the watcher this is equivalent to
+        get_preferred_usb.
+        """
+        return self.get_preferred_usb()
+
+    @contextmanager
+    def usb_session(self):
+        """
+        Pin the preferred USB drive for a block of operations
+
+        Resolves the drive once and holds the result for the duration
+        of the with-block, so a burst of get_storage_path /
+        create_readme_on_usb / get_usb_info calls (one collection
+        cycle, or the test harness) shares a single scan.
+
+        Yields:
+            The pinned USB mount point, or None
+        """
+        usb = self.get_preferred_usb()
+        self._usb_cache = (usb, float('inf'))
+        try:
+            yield usb
+        finally:
+            # Expire immediately so the next standalone call rescans
+            self._usb_cache = (usb, 0.0)
+
+    def _statvfs(self, mount_point):
+        """
+        statvfs with a short per-mount cache
+
+        Args:
+            mount_point: Mount point to stat
+
+        Returns:
+            os.statvfs_result for the mount
+        """
+        cached = self._statvfs_cache.get(mount_point)
+        if cached is not None:
+            fetched_at, stat = cached
+            if time.monotonic() - fetched_at < 2.0:
+                return stat
+
+        stat = os.statvfs(mount_point)
+        self._statvfs_cache[mount_point] = (time.monotonic(), stat)
+        return stat
+
+    def _scan_preferred_usb(self):
+        """Uncached drive scan behind get_preferred_usb"""
         usb_drives = self.find_usb_drives()
         
         if not usb_drives:
@@ -80,7 +297,7 @@ class USBStorageManager:
         # Check each drive for sufficient space (at least 100MB)
         for usb in usb_drives:
             try:
-                stat = os.statvfs(usb)
+                stat = self._statvfs(usb)
                 free_space = stat.f_bavail * stat.f_frsize
                 free_mb = free_space / (1024 * 1024)
                 
@@ -105,7 +322,13 @@ class USBStorageManager:
         """
         # Try USB first
         usb = self.get_preferred_usb()
-        
+
+        # Serve from the cache as long as the preferred mount hasn't
+        # changed since the path was resolved
+        cached = self._path_cache.get(data_type)
+        if cached is not None and cached[0] == usb:
+            return cached[1]
+
         if usb:
             # Create project directory on USB
             usb_project_dir = Path(usb) / 'pedestrian-monitoring'
@@ -115,16 +338,96 @@ class USBStorageManager:
                 usb_data_dir.mkdir(parents=True, exist_ok=True)
                 self.usb_mount_point = usb
                 self.logger.info(f"Saving {data_type} data to USB: {usb_data_dir}")
+                self._path_cache[data_type] = (usb, usb_data_dir)
                 return usb_data_dir
             except Exception as e:
                 self.logger.error(f"Error creating USB directory: {e}")
-        
+
         # Fallback to local storage
         local_dir = Path(self.config['storage'][f'{data_type}_data_dir'])
         local_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"Saving {data_type} data to local storage: {local_dir}")
+        self._path_cache[data_type] = (usb, local_dir)
         return local_dir
     
+    def _fast_copy(self, source_file, dest_file):
+        """
+        Copy a file while keeping the bytes in kernel space
+
+        copy_file_range (or sendfile across filesystems) avoids the
+        userspace read/write loop shutil.copy2 can fall back to, and a
+        single fsync makes sure a yanked stick can't lose the file.
+
+        Args:
+            source_file: Path to copy from
+            dest_file: Path to copy to
+        """
+        source_file = str(source_file)
+        dest_file = str(dest_file)
+
+        # The fd-level path below is Linux-specific; elsewhere (dev
+        # machines running the dashboards or tests) shutil.copy2
+        # already dispatches to the platform's native fast copy
+        # (fcopyfile on macOS, CopyFile2 on Windows)
+        if sys.platform != 'linux':
+            shutil.copy2(source_file, dest_file)
+            return
+
+        size = os.stat(source_file).st_size
+
+        src_fd = os.open(source_file, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            # Tune readahead for a streaming pass
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            dst_fd = os.open(
+                dest_file,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC,
+                0o644
+            )
+            try:
+                # Reserve the full extent up front to avoid fragmented
+                # allocations on FAT-formatted sticks
+                if size and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(dst_fd, 0, size)
+                    except OSError:
+                        pass
+
+                copied = 0
+                try:
+                    while copied < size:
+                        sent = os.copy_file_range(src_fd, dst_fd, size - copied)
+                        if sent == 0:
+                            break
+                        copied += sent
+                except OSError:
+                    # EXDEV/ENOSYS: sendfile also stays in kernel space
+                    if copied:
+                        raise
+                    os.lseek(dst_fd, 0, os.SEEK_SET)
+                    while copied < size:
+                        sent = os.sendfile(dst_fd, src_fd, copied, size - copied)
+                        if sent == 0:
+                            break
+                        copied += sent
+
+                os.fsync(dst_fd)
+            finally:
+                os.close(dst_fd)
+
+            # The copied log won't be re-read here; drop its pages so
+            # the copy doesn't evict the collector's hot data on
+            # small-RAM devices
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(src_fd)
+
+        # Preserve mtime so sync comparisons keep working
+        shutil.copystat(source_file, dest_file)
+
     def save_to_usb_with_fallback(self, source_file, data_type='raw'):
         """
         Save file to USB (no local backup to preserve SD card space)
@@ -148,15 +451,56 @@ class USBStorageManager:
         
         try:
             # Copy to USB/storage
-            shutil.copy2(source_file, usb_file)
+            self._fast_copy(source_file, usb_file)
             self.logger.debug(f"Saved to: {usb_file}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error saving file: {e}")
             self.logger.warning("USB save failed - file not backed up (SD card space preservation)")
+            # A failed write usually means the stick was yanked; drop
+            # the cached drive state so the next call re-detects
+            self.refresh()
             return False
     
+    def _rsync_directory(self, source_dir, dest_dir):
+        """
+        Sync a directory's top-level files with rsync
+
+        Args:
+            source_dir: Directory to sync
+            dest_dir: Destination directory
+
+        Returns:
+            Number of files transferred, or None if rsync failed
+        """
+        try:
+            # -d (no -r) skips subdirectories so this path copies the
+            # same set of files as the Python fallback below
+            result = subprocess.run(
+                ['rsync', '-dt', '--update', '--inplace', '--stats',
+                 "--exclude=*/", f"{source_dir}/", f"{dest_dir}/"],
+                capture_output=True,
+                text=True
+            )
+        except OSError as e:
+            self.logger.error(f"Error running rsync: {e}")
+            return None
+
+        if result.returncode != 0:
+            self.logger.error(f"rsync exited {result.returncode}: {result.stderr.strip()}")
+            return None
+
+        for line in result.stdout.splitlines():
+            # 'Number of regular files transferred: 12' (rsync >= 3.1)
+            # or 'Number of files transferred: 12' on older versions
+            if line.startswith('Number of') and 'transferred' in line:
+                try:
+                    return int(line.split(':')[1].strip().replace(',', ''))
+                except ValueError:
+                    break
+        return 0
+
     def sync_directory_to_usb(self, source_dir, data_type='raw'):
         """
         Sync entire directory to USB
@@ -176,20 +520,63 @@ class USBStorageManager:
         
         usb_dir = self.get_storage_path(data_type)
         synced_count = 0
-        
-        for source_file in source_dir.glob('*'):
-            if source_file.is_file():
-                usb_file = usb_dir / source_file.name
-                
-                # Only copy if file doesn't exist or is newer
-                if not usb_file.exists() or source_file.stat().st_mtime > usb_file.stat().st_mtime:
-                    try:
-                        shutil.copy2(source_file, usb_file)
-                        synced_count += 1
-                        self.logger.debug(f"Synced: {source_file.name}")
-                    except Exception as e:
-                        self.logger.error(f"Error syncing {source_file.name}: {e}")
-        
+
+        # One scandir pass: DirEntry caches the stat result, so the
+        # source side costs a single getdents plus at most one stat
+        # per file instead of glob + separate stat calls
+        with os.scandir(source_dir) as it:
+            entries = [e for e in it if e.is_file(follow_symlinks=False)]
+
+        # Big batches go through rsync when it's installed: the same
+        # mtime-based incremental copy, but entirely in C with
+        # pipelined I/O instead of a Python stat+copy per file
+        if self._rsync and len(entries) > 32:
+            count = self._rsync_directory(source_dir, usb_dir)
+            if count is not None:
+                self.logger.info(f"Synced {count} files to USB")
+                return count
+            self.logger.warning("rsync failed, falling back to file-by-file sync")
+
+        # Plain string joins in the loop: Path construction per file is
+        # several times the cost of os.path.join on this hot path
+        dst_root = os.fspath(usb_dir)
+
+        to_copy = []
+        for entry in entries:
+            usb_file = os.path.join(dst_root, entry.name)
+
+            # Only copy if file doesn't exist or is newer; integer
+            # nanosecond mtimes avoid float rounding jitter
+            src_mtime = entry.stat().st_mtime_ns
+            try:
+                dst_mtime = os.stat(usb_file).st_mtime_ns
+            except FileNotFoundError:
+                dst_mtime = -1
+
+            if src_mtime > dst_mtime:
+                to_copy.append((entry.path, entry.name, usb_file))
+
+        def copy_one(item):
+            source_path, name, dest_path = item
+            try:
+                self._fast_copy(source_path, dest_path)
+                self.logger.debug(f"Synced: {name}")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error syncing {name}: {e}")
+                return False
+
+        # A few in-flight copies overlap the SD read with the USB
+        # write (the copy syscalls release the GIL); USB 2.0 sticks
+        # that seek badly under concurrency can disable this in config
+        parallel = self.config.get('storage', {}).get('parallel_usb_sync', True)
+
+        if parallel and len(to_copy) > 1:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                synced_count = sum(pool.map(copy_one, to_copy))
+        else:
+            synced_count = sum(map(copy_one, to_copy))
+
         self.logger.info(f"Synced {synced_count} files to USB")
         return synced_count
     
@@ -211,7 +598,7 @@ class USBStorageManager:
             }
         
         try:
-            stat = os.statvfs(usb)
+            stat = self._statvfs(usb)
             total_space = stat.f_blocks * stat.f_frsize
             free_space = stat.f_bavail * stat.f_frsize
             
@@ -235,29 +622,21 @@ class USBStorageManager:
         
         readme_path = Path(usb) / 'pedestrian-monitoring' / 'README.txt'
         
+        # Fill the pre-encoded template and push it out with one
+        # write + fsync, so the file lands atomically enough to survive
+        # an early USB removal
+        payload = _README_TEMPLATE.replace(
+            b'{timestamp}', time.strftime('%Y-%m-%d %H:%M:%S').encode()
+        )
+
         try:
-            with open(readme_path, 'w') as f:
-                f.write("=" * 70 + "\n")
-                f.write("PEDESTRIAN TRAFFIC MONITORING DATA\n")
-                f.write("=" * 70 + "\n\n")
-                f.write("This USB drive contains anonymized pedestrian traffic data.\n\n")
-                f.write("DATA STRUCTURE:\n")
-                f.write("  data/raw/      - Raw Bluetooth scan logs (JSONL format)\n")
-                f.write("  data/processed/ - Processed and aggregated data (CSV)\n")
-                f.write("  data/models/   - Trained machine learning models\n\n")
-                f.write("PRIVACY NOTICE:\n")
-                f.write("  - All MAC addresses are hashed (SHA-256)\n")
-                f.write("  - No personal identifiable information stored\n")
-                f.write("  - Stationary devices filtered out\n")
-                f.write("  - Data aggregated into time windows\n\n")
-                f.write("TO PROCESS THIS DATA:\n")
-                f.write("  1. Copy this folder to your computer\n")
-                f.write("  2. Run: python3 data_collection/data_processor.py\n")
-                f.write("  3. Run: python3 ml_models/model_trainer.py\n")
-                f.write("  4. Start API and dashboard to view results\n\n")
-                f.write(f"Data collected on: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 70 + "\n")
-            
+            fd = os.open(readme_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, payload)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
             self.logger.info(f"Created README on USB: {readme_path}")
         except Exception as e:
             self.logger.error(f"Error creating README: {e}")
@@ -276,31 +655,33 @@ def test_usb_storage():
     )
     
     manager = USBStorageManager()
-    
-    # Get USB info
+
+    # Get USB info; the session pins the drive lookup so the whole
+    # block runs on a single scan
     print("\nChecking for USB drives...")
-    usb_info = manager.get_usb_info()
-    
-    if usb_info['available']:
-        print(f"✓ USB Drive Found!")
-        print(f"  Mount point: {usb_info['mount_point']}")
-        print(f"  Free space: {usb_info['free_space_mb']:.0f} MB")
-        print(f"  Total space: {usb_info['total_space_mb']:.0f} MB")
-        print(f"  Used: {usb_info['used_percent']:.1f}%")
-        
-        # Create README
-        print("\nCreating README on USB...")
-        manager.create_readme_on_usb()
-        
-        # Show storage paths
-        print("\nStorage paths:")
-        print(f"  Raw data: {manager.get_storage_path('raw')}")
-        print(f"  Processed: {manager.get_storage_path('processed')}")
-        print(f"  Models: {manager.get_storage_path('models')}")
-    else:
-        print("✗ No USB drive found")
-        print("  Data will be saved to local storage as fallback")
-        print(f"  Local backup: {manager.local_backup}")
+    with manager.usb_session():
+        usb_info = manager.get_usb_info()
+
+        if usb_info['available']:
+            print(f"✓ USB Drive Found!")
+            print(f"  Mount point: {usb_info['mount_point']}")
+            print(f"  Free space: {usb_info['free_space_mb']:.0f} MB")
+            print(f"  Total space: {usb_info['total_space_mb']:.0f} MB")
+            print(f"  Used: {usb_info['used_percent']:.1f}%")
+
+            # Create README
+            print("\nCreating README on USB...")
+            manager.create_readme_on_usb()
+
+            # Show storage paths
+            print("\nStorage paths:")
+            print(f"  Raw data: {manager.get_storage_path('raw')}")
+            print(f"  Processed: {manager.get_storage_path('processed')}")
+            print(f"  Models: {manager.get_storage_path('models')}")
+        else:
+            print("✗ No USB drive found")
+            print("  Data will be saved to local storage as fallback")
+            print(f"  Local backup: {manager.local_backup}")
     
     print("\n" + "=" * 60)
 